@@ -5,9 +5,18 @@ import matplotlib.pyplot as plt
 import plotly.express as px
 import tempfile
 import os
+import shutil
 from audio_handler import transcribe_audio, record_audio, transcribe_from_microphone
 from .grammar_analyzer import analyze_grammar
-from utils import highlight_errors, generate_statistics
+from utils import highlight_excerpts, generate_statistics, summarize_matches, paginate
+from session_manager import get_resource_manager, current_session_id
+from rule_packs import LANGUAGES, DEFAULT_LANGUAGE
+
+# Resource-manager keys owned by the Live Recording tab
+LIVE_RESULT_KEYS = ("audio_data", "transcription", "live_results")
+
+# Page sizes offered for the detailed feedback list
+RESULTS_PAGE_SIZES = [10, 25, 50]
 
 st.set_page_config(
     page_title="Grammar Scoring Engine",
@@ -18,6 +27,21 @@ st.set_page_config(
 def main():
     st.title("Grammar Scoring Engine for Voice Samples")
     
+    # Large per-session objects live in the shared resource manager rather
+    # than in st.session_state so they count against a memory budget
+    resources = get_resource_manager()
+    session_id = current_session_id()
+    display_resource_usage(resources)
+    
+    # The spoken language selects both the recognizer language and the rule pack
+    language_codes = list(LANGUAGES)
+    language = st.sidebar.selectbox(
+        "Spoken language",
+        language_codes,
+        index=language_codes.index(DEFAULT_LANGUAGE),
+        format_func=lambda code: LANGUAGES[code]['name']
+    )
+    
     # Create tabs for different input methods
     tab1, tab2 = st.tabs(["Upload Audio", "Live Recording"])
     
@@ -32,65 +56,77 @@ def main():
         )
 
         if uploaded_file is not None:
-            # Create a progress container
-            progress_container = st.container()
-            
-            with progress_container:
-                progress_text = st.empty()
-                progress_bar = st.progress(0)
-                
-                # Processing steps
-                progress_text.text("Processing audio file...")
-                progress_bar.progress(25)
+            # Reuse the previous analysis when the page reruns for the same
+            # upload, e.g. while paging through the results. file_id is unique
+            # per upload, unlike the file's name and size.
+            upload_key = f"{uploaded_file.file_id}:{language}"
+            cached_results = resources.get(session_id, "upload_results")
+            if cached_results is not None and cached_results[0] == upload_key:
+                display_results(*cached_results[1:], key_prefix="upload")
+            else:
+                # Create a progress container
+                progress_container = st.container()
                 
-                # Save uploaded file temporarily
-                with tempfile.NamedTemporaryFile(delete=False, suffix=f".{uploaded_file.name.split('.')[-1]}") as tmp_file:
-                    tmp_file.write(uploaded_file.getvalue())
-                    temp_filename = tmp_file.name
-                
-                try:
-                    # Transcribe audio
-                    progress_text.text("Transcribing speech to text...")
-                    progress_bar.progress(50)
-                    
-                    transcription = transcribe_audio(temp_filename)
-                    
-                    if not transcription:
-                        st.error("Could not transcribe the audio. Please ensure the audio contains clear speech.")
-                        return
-                    
-                    # Analyze grammar
-                    progress_text.text("Analyzing grammar...")
-                    progress_bar.progress(75)
-                    
-                    grammar_analysis = analyze_grammar(transcription)
-                    
-                    # Generate statistics
-                    progress_text.text("Generating results...")
-                    progress_bar.progress(100)
+                with progress_container:
+                    progress_text = st.empty()
+                    progress_bar = st.progress(0)
                     
-                    stats = generate_statistics(grammar_analysis)
+                    # Processing steps
+                    progress_text.text("Processing audio file...")
+                    progress_bar.progress(25)
                     
-                    # Clear progress elements
-                    progress_text.empty()
-                    progress_bar.empty()
+                    # Save uploaded file temporarily
+                    with tempfile.NamedTemporaryFile(delete=False, suffix=f".{uploaded_file.name.split('.')[-1]}") as tmp_file:
+                        # Copy in chunks rather than materialising another full copy
+                        uploaded_file.seek(0)
+                        shutil.copyfileobj(uploaded_file, tmp_file, 1024 * 1024)
+                        temp_filename = tmp_file.name
                     
-                    # Display results
-                    display_results(transcription, grammar_analysis, stats)
-                    
-                except Exception as e:
-                    st.error(f"An error occurred: {str(e)}")
-                finally:
-                    # Remove temporary file
-                    if os.path.exists(temp_filename):
-                        os.remove(temp_filename)
+                    try:
+                        # Transcribe audio
+                        progress_text.text("Transcribing speech to text...")
+                        progress_bar.progress(50)
+                        
+                        transcription = transcribe_audio(temp_filename, language)
+                        
+                        if not transcription:
+                            st.error("Could not transcribe the audio. Please ensure the audio contains clear speech.")
+                            return
+                        
+                        # Analyze grammar
+                        progress_text.text("Analyzing grammar...")
+                        progress_bar.progress(75)
+                        
+                        grammar_analysis = analyze_grammar(transcription, language)
+                        
+                        # Generate statistics
+                        progress_text.text("Generating results...")
+                        progress_bar.progress(100)
+                        
+                        stats = generate_statistics(grammar_analysis)
+                        resources.put(session_id, "upload_results",
+                                      (upload_key, transcription, grammar_analysis, stats))
+                        
+                        # Clear progress elements
+                        progress_text.empty()
+                        progress_bar.empty()
+                        
+                        # Display results
+                        display_results(transcription, grammar_analysis, stats, key_prefix="upload")
+                        
+                    except Exception as e:
+                        st.error(f"An error occurred: {str(e)}")
+                    finally:
+                        # Remove temporary file
+                        if os.path.exists(temp_filename):
+                            os.remove(temp_filename)
         else:
             st.info("Please upload an audio file to get started.")
             
             # Display sample information
             with st.expander("How it works"):
                 st.write("""
-                1. Upload an audio file containing spoken English
+                1. Upload an audio file containing spoken English, Spanish or German
                 2. Our system will transcribe the speech to text
                 3. We'll analyze the grammar and provide a detailed score
                 4. You'll receive feedback on any grammatical errors found
@@ -111,8 +147,6 @@ def main():
         # Session state to track if we've recorded audio
         if "audio_recorded" not in st.session_state:
             st.session_state.audio_recorded = False
-            st.session_state.audio_data = None
-            st.session_state.transcription = None
             st.session_state.analyzed = False
         
         # Recording duration selector
@@ -128,7 +162,8 @@ def main():
             if st.button("Start Recording"):
                 with st.spinner("Recording in progress..."):
                     # Record audio
-                    st.session_state.audio_data = record_audio(duration)
+                    resources.put(session_id, "audio_data", record_audio(duration))
+                    resources.discard(session_id, "transcription")
                     st.session_state.audio_recorded = True
                     st.session_state.analyzed = False
         
@@ -145,8 +180,17 @@ def main():
                         progress_text.text("Transcribing speech to text...")
                         progress_bar.progress(33)
                         
-                        transcription = transcribe_from_microphone(st.session_state.audio_data)
-                        st.session_state.transcription = transcription
+                        audio_data = resources.get(session_id, "audio_data")
+                        if audio_data is None:
+                            # The session was idle long enough to be evicted
+                            st.warning("The recording has expired. Please record again.")
+                            st.session_state.audio_recorded = False
+                            progress_text.empty()
+                            progress_bar.empty()
+                            return
+                        
+                        transcription = transcribe_from_microphone(audio_data, language)
+                        resources.put(session_id, "transcription", transcription)
                         
                         if not transcription:
                             st.error("Could not transcribe the audio. Please try speaking more clearly.")
@@ -158,31 +202,38 @@ def main():
                         progress_text.text("Analyzing grammar...")
                         progress_bar.progress(66)
                         
-                        grammar_analysis = analyze_grammar(transcription)
+                        grammar_analysis = analyze_grammar(transcription, language)
                         
                         # Generate statistics
                         progress_text.text("Generating results...")
                         progress_bar.progress(100)
                         
                         stats = generate_statistics(grammar_analysis)
+                        resources.put(session_id, "live_results",
+                                      (transcription, grammar_analysis, stats))
                         
                         # Clear progress elements
                         progress_text.empty()
                         progress_bar.empty()
                         
-                        # Display results
-                        display_results(transcription, grammar_analysis, stats)
-                        
                         # Set analyzed to true
                         st.session_state.analyzed = True
         
+        # Display results (kept across reruns so the result pages can be browsed)
+        if st.session_state.analyzed:
+            live_results = resources.get(session_id, "live_results")
+            if live_results is not None:
+                display_results(*live_results, key_prefix="live")
+        
         # Reset button (only show after analysis)
         if st.session_state.analyzed:
             if st.button("Record New Speech"):
                 st.session_state.audio_recorded = False
-                st.session_state.audio_data = None
-                st.session_state.transcription = None
                 st.session_state.analyzed = False
+                # Only drop the live-recording data; the Upload tab's cached
+                # results stay so it does not transcribe its file again
+                for key in LIVE_RESULT_KEYS:
+                    resources.discard(session_id, key)
                 st.rerun()
         
         # Instructions
@@ -198,7 +249,20 @@ def main():
                 - Longer samples (10+ seconds) provide better analysis
                 """)
 
-def display_results(transcription, grammar_analysis, stats):
+def display_resource_usage(resources):
+    """
+    Show the server's session memory usage in the sidebar for capacity planning.
+    """
+    usage = resources.usage()
+    mb = 1024 * 1024
+    with st.sidebar.expander("Server memory usage"):
+        st.metric("Active sessions", usage['active_sessions'])
+        st.metric("Resident", f"{usage['resident_bytes'] / mb:.1f} MB",
+                  help=f"Global budget: {usage['global_budget_bytes'] / mb:.0f} MB")
+        st.metric("Spilled to disk", f"{usage['spilled_bytes'] / mb:.1f} MB")
+        st.caption(f"Evicted idle sessions: {usage['evicted_sessions']}")
+
+def display_results(transcription, grammar_analysis, stats, key_prefix="results"):
     st.subheader("Analysis Results")
     
     # Create columns for score and stats
@@ -237,16 +301,41 @@ def display_results(transcription, grammar_analysis, stats):
         
         # Display the highlighted errors
         st.subheader("Grammar Issues")
-        if grammar_analysis['matches']:
-            highlighted_text = highlight_errors(transcription, grammar_analysis['matches'])
-            st.markdown(highlighted_text, unsafe_allow_html=True)
+        if grammar_analysis.get('partial'):
+            st.warning("The analysis hit its time limit, so these results are partial.")
+        if grammar_analysis.get('disabled_rules'):
+            with st.expander(f"{len(grammar_analysis['disabled_rules'])} grammar rule(s) disabled"):
+                for rule in grammar_analysis['disabled_rules']:
+                    st.markdown(f"- {rule['message']} ({rule['reason']})")
+        matches = grammar_analysis['matches']
+        if matches:
+            # Grouped summary: one row per rule however many times it fired
+            st.dataframe(summarize_matches(matches), use_container_width=True, hide_index=True)
+            
+            # Only one page of issues is highlighted and expanded at a time so
+            # rendering cost does not grow with the number of matches
+            sorted_matches = sorted(matches, key=lambda x: x['offset'])
+            page_col, size_col = st.columns([2, 1])
+            with size_col:
+                page_size = st.selectbox("Issues per page", RESULTS_PAGE_SIZES,
+                                         key=f"{key_prefix}_page_size")
+            total_pages = max(1, -(-len(sorted_matches) // page_size))
+            with page_col:
+                page = st.number_input(f"Page (of {total_pages})", min_value=1,
+                                       max_value=total_pages, value=1, step=1,
+                                       key=f"{key_prefix}_page")
+            page_matches, first, _ = paginate(sorted_matches, int(page), page_size)
+            
+            st.markdown(highlight_excerpts(transcription, page_matches), unsafe_allow_html=True)
             
             # Display detailed error information
             st.subheader("Detailed Feedback")
-            for i, match in enumerate(grammar_analysis['matches']):
+            for i, match in enumerate(page_matches, start=first):
                 with st.expander(f"Issue #{i+1}: {match['message'][:50]}..."):
-                    st.markdown(f"**Error Type:** {match['rule'].get('category', 'Grammar')} error")
+                    st.markdown(f"**Error Type:** {match['rule'].get('category', {}).get('name', 'Grammar')} error")
                     st.markdown(f"**Issue:** {match['message']}")
+                    if 'confidence' in match:
+                        st.markdown(f"**Confidence:** {match['confidence']:.0%}")
                     if match.get('replacements'):
                         st.markdown(f"**Suggested correction:** {', '.join(match['replacements'][:3])}")
                     st.markdown(f"**Context:** ...{match['context']}...")
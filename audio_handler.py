@@ -1,11 +1,17 @@
 import streamlit as st
 import speech_recognition as sr
 import os
-import tempfile
 import time
-import base64
+from wav_reader import WavReader, is_wav
+from rule_packs import DEFAULT_LANGUAGE, speech_code
+import simulated_input
 
-def transcribe_audio(audio_path):
+# Recognizer shared by all sessions for recognize_google calls only, which
+# keep no per-request state. Anything that tunes the recognizer (such as
+# adjust_for_ambient_noise, which sets energy_threshold) needs its own instance.
+_recognizer = sr.Recognizer()
+
+def transcribe_audio(audio_path, language=DEFAULT_LANGUAGE, recognizer=None):
     """
     Transcribe the given audio file to text using speech recognition.
     
@@ -13,20 +19,42 @@ def transcribe_audio(audio_path):
     -----------
     audio_path : str
         Path to the audio file to transcribe
+    language : str
+        Language key of the speech, e.g. 'en'
+    recognizer : Recognizer or None
+        Recognizer to use (the shared module recognizer by default)
         
     Returns:
     --------
     str
         Transcribed text, or empty string if transcription failed
     """
-    # Initialize recognizer
-    recognizer = sr.Recognizer()
+    # Use the shared recognizer unless the caller supplies one
+    if recognizer is None:
+        recognizer = _recognizer
     
     # Check if the file exists
     if not os.path.exists(audio_path):
         st.error(f"Audio file not found at {audio_path}")
         return ""
     
+    # Stream WAV files segment by segment from a memory map so hour-long
+    # uploads never have to be decoded into memory in one piece
+    if is_wav(audio_path):
+        try:
+            reader = WavReader(audio_path)
+        except ValueError:
+            # Compressed or unusual WAV encodings go through sr.AudioFile
+            reader = None
+        if reader is not None:
+            with reader:
+                return _transcribe_wav_segments(recognizer, reader, language)
+    
+    # Ambient noise calibration changes the recognizer's energy_threshold,
+    # so never run it on the shared instance
+    if recognizer is _recognizer:
+        recognizer = sr.Recognizer()
+    
     # Load the audio file
     try:
         with sr.AudioFile(audio_path) as source:
@@ -39,7 +67,7 @@ def transcribe_audio(audio_path):
             # Try to recognize the speech
             try:
                 # Use Google's speech recognition service
-                text = recognizer.recognize_google(audio_data)
+                text = recognizer.recognize_google(audio_data, language=speech_code(language))
                 return text
             except sr.UnknownValueError:
                 st.warning("Speech Recognition could not understand the audio")
@@ -55,61 +83,60 @@ def transcribe_audio(audio_path):
             st.error(f"Error processing the audio file: {e}")
         return ""
 
+def _transcribe_wav_segments(recognizer, reader, language=DEFAULT_LANGUAGE):
+    """
+    Transcribe a memory-mapped WAV file one segment at a time.
+    
+    Parameters:
+    -----------
+    recognizer : Recognizer
+        The speech recognizer to use
+    reader : WavReader
+        Open reader for the WAV file
+    language : str
+        Language key of the speech, e.g. 'en'
+        
+    Returns:
+    --------
+    str
+        Transcribed text, or empty string if transcription failed
+    """
+    texts = []
+    try:
+        for start, stop in reader.iter_segments():
+            audio_data = reader.to_audio_data(start, stop)
+            reader.release(start, stop)
+            try:
+                texts.append(recognizer.recognize_google(audio_data, language=speech_code(language)))
+            except sr.UnknownValueError:
+                # Silence or unintelligible speech in this segment only
+                continue
+    except sr.RequestError as e:
+        st.error(f"Could not request results from Speech Recognition service; {e}")
+        return ""
+    except Exception as e:
+        st.error(f"Error processing the audio file: {e}")
+        return ""
+    
+    if not texts:
+        st.warning("Speech Recognition could not understand the audio")
+        return ""
+    
+    return " ".join(texts)
+
 def get_sample_audio_data():
     """
     Create a simulated audio data object for environments where microphone
     access is not available (like Replit).
     
+    The sample comes straight from an in-memory table, with no file I/O.
+    
     Returns:
     --------
     AudioData
         A sample audio data object containing sample speech
     """
-    # Sample text to use for demonstration
-    sample_texts = [
-        "Hello world this is a grammar test",
-        "I have been working on my english skills for many years",
-        "This sentence contains two grammatical error",
-        "She don't like ice cream but I do",
-        "The weather are nice today and we should go outside",
-        "I would of gone to the party if I had been invited",
-        "Between you and I this project is very exciting",
-        "Their going to announce the winners tomorrow morning",
-        "I have went to the store already",
-        "The book was laying on the table all day"
-    ]
-    
-    import random
-    selected_text = random.choice(sample_texts)
-    
-    # Create a temporary WAV file with silent audio
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp_file:
-        sample_path = tmp_file.name
-    
-    # Create recognizer and AudioData object with text
-    recognizer = sr.Recognizer()
-    
-    # In a real scenario, we would have actual audio data here
-    # For this simulation, we'll create a minimal AudioData object
-    # and attach our sample text to be returned by recognize_google
-    
-    # Use a very small WAV file as a placeholder
-    with open(sample_path, 'wb') as f:
-        # Write a minimal WAV header for a tiny silent audio clip
-        f.write(base64.b64decode(
-            'UklGRiQAAABXQVZFZm10IBAAAAABAAEARKwAAIhYAQACABAAZGF0YQAAAAA='))
-    
-    # Create audio data from the sample file
-    with sr.AudioFile(sample_path) as source:
-        audio_data = recognizer.record(source)
-    
-    # Clean up
-    os.remove(sample_path)
-    
-    # Add the selected text as an attribute to be used in simulation
-    audio_data.sample_text = selected_text
-    
-    return audio_data
+    return simulated_input.default_backend.sample()
 
 def record_audio(duration=5):
     """
@@ -176,7 +203,7 @@ def record_audio(duration=5):
         time.sleep(2)  # Simulate brief processing time
         return get_sample_audio_data()
 
-def transcribe_from_microphone(audio_data):
+def transcribe_from_microphone(audio_data, language=DEFAULT_LANGUAGE):
     """
     Transcribe recorded audio data from the microphone.
     For simulated data, returns the sample text.
@@ -185,6 +212,8 @@ def transcribe_from_microphone(audio_data):
     -----------
     audio_data : AudioData
         The recorded audio data object
+    language : str
+        Language key of the speech, e.g. 'en'
         
     Returns:
     --------
@@ -198,12 +227,9 @@ def transcribe_from_microphone(audio_data):
     if hasattr(audio_data, 'sample_text'):
         return audio_data.sample_text
         
-    # Initialize recognizer
-    recognizer = sr.Recognizer()
-    
     try:
         # Try to recognize the speech
-        text = recognizer.recognize_google(audio_data)
+        text = _recognizer.recognize_google(audio_data, language=speech_code(language))
         return text
     except sr.UnknownValueError:
         st.warning("Speech Recognition could not understand the audio")
@@ -0,0 +1,71 @@
+"""
+Benchmark the kiosk demo path: get a simulated recording and transcribe it.
+
+Compares the in-memory simulated input backend with the previous
+implementation, which wrote a placeholder WAV to a temp file, read it back
+through sr.AudioFile and deleted it on every call.
+
+Example:
+    python bench_demo.py --calls 2000
+"""
+import argparse
+import base64
+import logging
+import os
+import random
+import tempfile
+import time
+
+import speech_recognition as sr
+
+# Streamlit warns about a missing script context when imported outside `streamlit run`
+logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+from audio_handler import get_sample_audio_data, transcribe_from_microphone
+from simulated_input import SAMPLE_TEXTS
+
+# The minimal silent WAV the previous implementation wrote for each call
+_PLACEHOLDER_WAV = base64.b64decode('UklGRiQAAABXQVZFZm10IBAAAAABAAEARKwAAIhYAQACABAAZGF0YQAAAAA=')
+
+
+def legacy_sample_audio_data():
+    """The temp-file based get_sample_audio_data this backend replaced."""
+    selected_text = random.choice(SAMPLE_TEXTS)
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp_file:
+        sample_path = tmp_file.name
+    recognizer = sr.Recognizer()
+    with open(sample_path, 'wb') as f:
+        f.write(_PLACEHOLDER_WAV)
+    with sr.AudioFile(sample_path) as source:
+        audio_data = recognizer.record(source)
+    os.remove(sample_path)
+    audio_data.sample_text = selected_text
+    return audio_data
+
+
+def bench(name, get_audio, calls):
+    # Warm up imports and caches outside the timed loop
+    for _ in range(10):
+        transcribe_from_microphone(get_audio())
+    start = time.perf_counter()
+    for _ in range(calls):
+        text = transcribe_from_microphone(get_audio())
+    elapsed = time.perf_counter() - start
+    assert text in SAMPLE_TEXTS
+    per_call_us = elapsed / calls * 1e6
+    print(f"{name:<12} {calls:>8} calls  {per_call_us:>10.1f} us/call  {calls / elapsed:>12.0f} calls/s")
+    return per_call_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the simulated-input demo path.")
+    parser.add_argument("--calls", type=int, default=2000, help="calls per variant (default: 2000)")
+    args = parser.parse_args()
+
+    legacy = bench("temp file", legacy_sample_audio_data, args.calls)
+    current = bench("in-memory", get_sample_audio_data, args.calls)
+    print(f"speedup: {legacy / current:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 import streamlit as st
 from simple_grammar_checker import check_grammar, calculate_grammar_score
+from rule_packs import DEFAULT_LANGUAGE
+from rule_engine import DOCUMENT_TIME_BUDGET, RULE_TIME_BUDGET
 
-def analyze_grammar(text):
+def analyze_grammar(text, language=DEFAULT_LANGUAGE):
     """
     Analyze the grammar of the provided text using our custom grammar checker.
     
@@ -9,6 +11,8 @@ def analyze_grammar(text):
     -----------
     text : str
         The text to analyze for grammar errors
+    language : str
+        Language key selecting the rule pack, e.g. 'en'
         
     Returns:
     --------
@@ -16,12 +20,17 @@ def analyze_grammar(text):
         A dictionary containing grammar analysis results:
         - 'matches': List of grammar issues found
         - 'total_errors': Total number of grammar issues
+        - 'partial': True if the time budget cut the analysis short
+        - 'disabled_rules': Rules switched off as unsafe or too slow
     """
     if not text:
         return {'matches': [], 'total_errors': 0}
     
-    # Check the text for grammar errors using our custom checker
-    return check_grammar(text)
+    # Check the text for grammar errors using our custom checker. Rules run
+    # under a time budget so one slow pattern cannot hang the worker.
+    return check_grammar(text, language,
+                         document_budget=DOCUMENT_TIME_BUDGET,
+                         rule_budget=RULE_TIME_BUDGET)
 
 def get_grammar_score(text, matches):
     """
@@ -0,0 +1,289 @@
+"""
+Load generator for the grammar scoring pipeline.
+
+Simulates N concurrent users, each running a number of sessions through
+transcribe_audio (with a stub recognizer that sleeps for a configurable
+latency instead of calling Google), analyze_grammar, generate_statistics and
+highlight_errors. Each concurrency level runs in a fresh process so CPU time
+and peak RSS are measured per configuration.
+
+Example:
+    python load_test.py --users 1,8,32 --sessions 10 --latency 0.5 \
+        --mix short=0.6,medium=0.3,long=0.1
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from queue import Empty
+
+import numpy as np
+import speech_recognition as sr
+
+# Words per transcript for each length class in the mix
+TRANSCRIPT_WORDS = {"short": 25, "medium": 250, "long": 2500}
+
+# Sentences used to build transcripts; several contain deliberate errors
+SAMPLE_SENTENCES = [
+    "Hello world this is a grammar test.",
+    "I have been working on my english skills for many years.",
+    "This sentence contains two grammatical error.",
+    "She don't like ice cream but I do.",
+    "The weather are nice today and we should go outside.",
+    "I would of gone to the party if I had been invited.",
+    "Between you and I this project is very exciting.",
+    "Their going to announce the winners tomorrow morning.",
+    "I have went to the store already.",
+    "The book was laying on the table all day.",
+]
+
+
+class StubRecognizer:
+    """
+    Stands in for sr.Recognizer: waits `latency` seconds, then returns a
+    fixed transcript as if the speech service had recognised it.
+
+    transcribe_audio calls the recognizer once per WAV segment, so only the
+    first call returns the transcript (and pays the latency); later segments
+    are reported as containing no speech. Each session therefore analyses
+    the transcript exactly once, whatever the audio length.
+    """
+
+    def __init__(self, transcript, latency):
+        self.transcript = transcript
+        self.latency = latency
+        self._used = False
+
+    def recognize_google(self, audio_data, language=None):
+        if self._used:
+            raise sr.UnknownValueError()
+        self._used = True
+        time.sleep(self.latency)
+        return self.transcript
+
+
+def parse_mix(spec):
+    """Parse 'short=0.6,medium=0.4' into a {length: weight} dict."""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in TRANSCRIPT_WORDS:
+            raise argparse.ArgumentTypeError(
+                f"Unknown transcript length '{name}' (choose from {', '.join(TRANSCRIPT_WORDS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def make_transcript(words, rng):
+    """Build a transcript of roughly `words` words from the sample sentences."""
+    sentences = []
+    count = 0
+    while count < words:
+        sentence = rng.choice(SAMPLE_SENTENCES)
+        sentences.append(sentence)
+        count += len(sentence.split())
+    return " ".join(sentences)
+
+
+def write_silent_wav(path, seconds, sample_rate=16000):
+    """Write a mono 16-bit WAV file of silence."""
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(b"\0\0" * int(seconds * sample_rate))
+
+
+def run_session(wav_path, transcript, latency, language):
+    """
+    Run one simulated session through the pipeline.
+
+    Returns:
+    --------
+    tuple
+        (latency in seconds, whether the grammar results were partial,
+        number of grammar rules disabled at the time)
+    """
+    # Imported here so the cost is paid inside the measured worker process
+    from audio_handler import transcribe_audio
+    from grammar_analyzer import analyze_grammar
+    from utils import generate_statistics, highlight_errors
+
+    start = time.perf_counter()
+    recognizer = StubRecognizer(transcript, latency)
+    transcription = transcribe_audio(wav_path, language, recognizer=recognizer)
+    grammar_analysis = analyze_grammar(transcription, language)
+    generate_statistics(grammar_analysis)
+    highlight_errors(transcription, grammar_analysis["matches"])
+    elapsed = time.perf_counter() - start
+    return (elapsed, grammar_analysis.get("partial", False),
+            len(grammar_analysis.get("disabled_rules", [])))
+
+
+def run_configuration(users, sessions, mix, latency, audio_seconds, language, seed):
+    """
+    Run one concurrency level and measure it.
+
+    Meant to be called in a fresh process: the peak RSS reported is the
+    process high-water mark.
+
+    Returns:
+    --------
+    dict
+        Throughput, latency percentiles, CPU time, peak RSS and how many
+        sessions got partial grammar results
+    """
+    # Streamlit warns about a missing script context for every st.* call
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    from grammar_analyzer import analyze_grammar
+
+    rng = random.Random(seed)
+    lengths = list(mix)
+    weights = [mix[name] for name in lengths]
+    work = []
+    for _ in range(users * sessions):
+        length = rng.choices(lengths, weights)[0]
+        work.append(make_transcript(TRANSCRIPT_WORDS[length], rng))
+
+    fd, wav_path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    try:
+        write_silent_wav(wav_path, audio_seconds)
+        # Compile the rule pack before timing starts
+        analyze_grammar("Warm up the grammar engine.", language)
+
+        usage_before = resource.getrusage(resource.RUSAGE_SELF)
+        wall_start = time.perf_counter()
+
+        def user_loop(user):
+            return [run_session(wav_path, transcript, latency, language)
+                    for transcript in work[user::users]]
+
+        with ThreadPoolExecutor(max_workers=users) as pool:
+            outcomes = [value for result in pool.map(user_loop, range(users)) for value in result]
+
+        wall = time.perf_counter() - wall_start
+        usage_after = resource.getrusage(resource.RUSAGE_SELF)
+    finally:
+        os.remove(wav_path)
+
+    cpu = ((usage_after.ru_utime - usage_before.ru_utime)
+           + (usage_after.ru_stime - usage_before.ru_stime))
+    latencies = [latency for latency, _, _ in outcomes]
+    latencies_ms = np.array(latencies) * 1000
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss_bytes = usage_after.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    return {
+        "users": users,
+        "sessions": len(latencies),
+        "throughput_per_s": len(latencies) / wall if wall else 0.0,
+        "latency_p50_ms": float(np.percentile(latencies_ms, 50)),
+        "latency_p95_ms": float(np.percentile(latencies_ms, 95)),
+        "latency_p99_ms": float(np.percentile(latencies_ms, 99)),
+        "cpu_seconds": cpu,
+        "cpu_percent": 100 * cpu / wall if wall else 0.0,
+        "peak_rss_mb": rss_bytes / (1024 * 1024),
+        "wall_seconds": wall,
+        # Throughput is only meaningful if the grammar check did its full job
+        "partial_sessions": sum(1 for _, partial, _ in outcomes if partial),
+        "max_disabled_rules": max(disabled for _, _, disabled in outcomes),
+    }
+
+
+def _worker(queue, *args):
+    queue.put(run_configuration(*args))
+
+
+def _wait_for_result(queue, process, timeout):
+    """
+    Wait for a worker's result without hanging if the worker dies.
+
+    Returns:
+    --------
+    dict or None
+        The result, or None if the worker crashed or ran out of time
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            result = queue.get(timeout=1)
+        except Empty:
+            if process.exitcode is not None:
+                # Exited without a result; one last look in case of a race
+                try:
+                    result = queue.get(timeout=1)
+                except Empty:
+                    return None
+            else:
+                continue
+        process.join()
+        return result
+    process.terminate()
+    process.join()
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the grammar scoring pipeline.")
+    parser.add_argument("--users", default="1,4,16",
+                        help="comma-separated concurrency levels to test (default: 1,4,16)")
+    parser.add_argument("--sessions", type=int, default=5,
+                        help="sessions run back to back by each simulated user (default: 5)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("short=0.6,medium=0.3,long=0.1"),
+                        help="transcript length mix, e.g. short=0.6,medium=0.3,long=0.1")
+    parser.add_argument("--latency", type=float, default=0.5,
+                        help="stub speech recognizer latency per session in seconds (default: 0.5)")
+    parser.add_argument("--audio-seconds", type=float, default=5,
+                        help="length of the simulated uploaded WAV file (default: 5)")
+    parser.add_argument("--language", default="en", help="language key (default: en)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+    parser.add_argument("--timeout", type=float, default=3600,
+                        help="seconds to wait for each configuration (default: 3600)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON lines")
+    args = parser.parse_args()
+
+    # A fresh process per configuration keeps peak RSS and CPU time separate
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for users in (int(value) for value in args.users.split(",")):
+        queue = context.Queue()
+        process = context.Process(target=_worker, args=(
+            queue, users, args.sessions, args.mix, args.latency,
+            args.audio_seconds, args.language, args.seed))
+        process.start()
+        result = _wait_for_result(queue, process, args.timeout)
+        if result is None:
+            sys.exit(f"Configuration with {users} users failed "
+                     f"(worker exit code {process.exitcode})")
+        results.append(result)
+        if args.json:
+            print(json.dumps(result), flush=True)
+
+    if not args.json:
+        header = (f"{'users':>6} {'sessions':>9} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} "
+                  f"{'p99 ms':>9} {'cpu s':>7} {'cpu %':>6} {'peak RSS MB':>12} "
+                  f"{'partial':>8} {'disabled':>9}")
+        print(header)
+        print("-" * len(header))
+        for r in results:
+            print(f"{r['users']:>6} {r['sessions']:>9} {r['throughput_per_s']:>8.2f} "
+                  f"{r['latency_p50_ms']:>9.1f} {r['latency_p95_ms']:>9.1f} "
+                  f"{r['latency_p99_ms']:>9.1f} {r['cpu_seconds']:>7.2f} "
+                  f"{r['cpu_percent']:>6.0f} {r['peak_rss_mb']:>12.1f} "
+                  f"{r['partial_sessions']:>8} {r['max_disabled_rules']:>9}")
+        if any(r['partial_sessions'] or r['max_disabled_rules'] for r in results):
+            print("\nWarning: some sessions ran with partial grammar checks or disabled "
+                  "rules; their throughput overstates real capacity.")
+
+
+if __name__ == "__main__":
+    main()
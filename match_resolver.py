@@ -0,0 +1,97 @@
+import heapq
+
+# Spans whose start and end each differ by at most this many characters are
+# treated as the same span (e.g. one rule including a trailing space). Only
+# applies when both spans are longer than this; shorter ones must match exactly.
+NEAR_SPAN_CHARS = 2
+
+def _priority(match):
+    return match.get('rule', {}).get('priority', 0)
+
+def _rule_id(match):
+    return match.get('rule', {}).get('id')
+
+def _group(match):
+    return match.get('rule', {}).get('group')
+
+def _end(match):
+    return match['offset'] + match['errorLength']
+
+def _sweep(indexed, key, conflicts, horizon):
+    """
+    Keep one hit per set of conflicting hits that share a key.
+
+    `indexed` holds (rule index, match) pairs. They are swept in order of
+    start offset while an index of the kept hits that are still active is
+    maintained per key: a heap ordered by `horizon(match)`, the offset from
+    which a later hit can no longer conflict with it. Each hit is compared
+    with every active kept hit for its key; it survives only if it outranks
+    all of those it conflicts with (higher priority, the rule listed first
+    wins ties), and then replaces them. Hits with key None are always kept.
+    O(m log m + m * a) for m hits and at most a active hits per key.
+    """
+    order = sorted(indexed, key=lambda item: (item[1]['offset'], item[0]))
+    # Slots of displaced hits are set to None
+    resolved = []
+    active = {}
+    for i, match in order:
+        k = key(match)
+        if k is None:
+            resolved.append((i, match))
+            continue
+        heap = active.setdefault(k, [])
+        while heap and heap[0][0] <= match['offset']:
+            heapq.heappop(heap)
+        rank = (_priority(match), -i)
+        clashing = [slot for _, slot in heap
+                    if resolved[slot] is not None and conflicts(resolved[slot][1], match)]
+        if any((_priority(resolved[slot][1]), -resolved[slot][0]) > rank for slot in clashing):
+            continue
+        for slot in clashing:
+            resolved[slot] = None
+        heapq.heappush(heap, (horizon(match), len(resolved)))
+        resolved.append((i, match))
+    return [item for item in resolved if item is not None]
+
+def _overlaps(kept, match):
+    return match['offset'] < _end(kept) and kept['offset'] < _end(match)
+
+def _same_span(kept, match):
+    if min(kept['errorLength'], match['errorLength']) <= NEAR_SPAN_CHARS:
+        return kept['offset'] == match['offset'] and _end(kept) == _end(match)
+    return (abs(match['offset'] - kept['offset']) <= NEAR_SPAN_CHARS
+            and abs(_end(match) - _end(kept)) <= NEAR_SPAN_CHARS)
+
+def _same_span_horizon(match):
+    return match['offset'] + NEAR_SPAN_CHARS + 1
+
+def resolve_matches(matches):
+    """
+    Collapse rule hits that report the same mistake into one issue.
+
+    Two hits count as the same mistake when either
+    - they come from rules in the same duplicate group (the rule's 'group'
+      key) and their spans overlap, e.g. the punctuation regex and the
+      sentence-split pass both flagging one capitalization error, or
+    - they have the same rule id and the same span, e.g. the general
+      "they (is|was|has)" rule and the specific "they is" rule. Spans longer
+      than NEAR_SPAN_CHARS may differ by that much at either end.
+    Among duplicates the higher-priority hit is kept. Different mistakes are
+    never merged just because one lies inside or next to the other, so a
+    sentence-wide double negative and a "could of" within it are both
+    reported.
+
+    Parameters:
+    -----------
+    matches : list
+        Match objects as produced by check_grammar, in rule order
+
+    Returns:
+    --------
+    list
+        The surviving matches, ordered by offset
+    """
+    indexed = list(enumerate(matches))
+    indexed = _sweep(indexed, _group, _overlaps, _end)
+    indexed = _sweep(indexed, _rule_id, _same_span, _same_span_horizon)
+    return sorted((match for _, match in indexed), key=lambda x: x['offset'])
@@ -0,0 +1,284 @@
+"""
+Context-aware confidence scores for grammar matches.
+
+A compact n-gram table built from correct text tells us how often the words
+a rule flagged occur in well-formed language. A hit such as "an hour" for
+the "an + consonant" rule is common in correct text and so gets a low
+confidence; an unseen phrase such as "have went" keeps full confidence.
+
+The table is a file of sorted 64-bit n-gram hashes followed by their counts.
+It is memory-mapped read-only, so lookups are a binary search over the
+mapped pages and every worker process shares one copy of them.
+
+Build a table from a corpus with:
+    python ngram_confidence.py corpus.txt en.ngrams
+"""
+import hashlib
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+
+from rule_engine import ENGINE_CACHE_SIZE
+
+# File layout: magic, version, entry count, then keys (uint64) and counts (uint32)
+_MAGIC = b"NGRM"
+_VERSION = 1
+_HEADER = struct.Struct("<4sIQ")
+
+# Orders of the n-grams stored in the table
+MIN_ORDER = 2
+MAX_ORDER = 3
+
+# Counts are added to this pseudo-count when turning them into a confidence
+SMOOTHING = 2.0
+
+# Directory holding prebuilt '<language>.ngrams' tables; when unset, tables
+# are built on first use from the seed corpora in data/ into a private
+# per-user cache directory
+NGRAM_DIR = os.environ.get("GRAMMAR_NGRAM_DIR")
+SEED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# The table ignores case and punctuation, so it says nothing about these
+_SKIPPED_CATEGORIES = {"Punctuation"}
+
+_WORD = re.compile(r"\w+(?:'\w+)*")
+
+
+def tokenize(text):
+    """Split text into lowercase word tokens."""
+    return [word.lower() for word in _WORD.findall(text)]
+
+
+def ngram_key(tokens):
+    """
+    Hash a sequence of tokens to the unsigned 64-bit key used in the table.
+
+    Uses BLAKE2b rather than hash() so keys are stable across processes.
+    """
+    digest = hashlib.blake2b("\x1f".join(tokens).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def build_table(lines, path):
+    """
+    Count the n-grams in a corpus and write them as a table file.
+
+    Parameters:
+    -----------
+    lines : iterable of str
+        The corpus, one sentence or paragraph per item
+    path : str
+        Where to write the table; replaced atomically
+    """
+    counts = Counter()
+    for line in lines:
+        tokens = tokenize(line)
+        for order in range(MIN_ORDER, MAX_ORDER + 1):
+            for i in range(len(tokens) - order + 1):
+                counts[ngram_key(tokens[i:i + order])] += 1
+
+    keys = np.fromiter(counts.keys(), dtype=np.uint64, count=len(counts))
+    values = np.fromiter(counts.values(), dtype=np.uint64, count=len(counts))
+    order = np.argsort(keys)
+    keys = keys[order]
+    values = np.minimum(values[order], np.iinfo(np.uint32).max).astype(np.uint32)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, len(keys)))
+            f.write(keys.astype("<u8").tobytes())
+            f.write(values.astype("<u4").tobytes())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class NgramTable:
+    """
+    Read-only, memory-mapped n-gram frequency table.
+
+    Parameters:
+    -----------
+    path : str
+        Path to a table written by build_table
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, size = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not an n-gram table")
+        offset = _HEADER.size
+        self.keys = np.frombuffer(self._mm, dtype="<u8", count=size, offset=offset)
+        self.counts = np.frombuffer(self._mm, dtype="<u4", count=size, offset=offset + 8 * size)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def count(self, tokens):
+        """
+        Return how often an n-gram occurred in the corpus.
+
+        Parameters:
+        -----------
+        tokens : list of str
+            Lowercase tokens
+
+        Returns:
+        --------
+        int
+            The count, or 0 if the n-gram is not in the table
+        """
+        key = np.uint64(ngram_key(tokens))
+        i = int(np.searchsorted(self.keys, key))
+        if i < len(self.keys) and self.keys[i] == key:
+            return int(self.counts[i])
+        return 0
+
+
+def _cache_dir():
+    """Per-user cache directory for built tables, private to the current user."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    path = os.path.join(base, "grammar_score_engine")
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    return path
+
+
+def _is_trusted(path):
+    """
+    True if a path belongs to us (or root) and nobody else can write to it.
+
+    Tables change match confidences and scores, so one planted by another
+    local user must never be mapped.
+    """
+    if not hasattr(os, "getuid"):
+        return True
+    st = os.lstat(path)
+    return st.st_uid in (os.getuid(), 0) and not st.st_mode & 0o022
+
+
+def _table_path(language):
+    if NGRAM_DIR:
+        return os.path.join(NGRAM_DIR, f"{language}.ngrams")
+
+    seed = os.path.join(SEED_DIR, f"ngram_seed_{language}.txt")
+    if not os.path.exists(seed):
+        return None
+    # Cache the built table in the user's private cache directory, keyed on
+    # the seed's size and mtime so an edited corpus gets rebuilt
+    stat = os.stat(seed)
+    path = os.path.join(_cache_dir(),
+                        f"ngrams_{language}_{stat.st_size}_{int(stat.st_mtime)}.ngrams")
+    if not os.path.exists(path):
+        with open(seed, encoding="utf-8") as f:
+            build_table(f, path)
+    return path
+
+
+@lru_cache(maxsize=ENGINE_CACHE_SIZE)
+def get_table(language):
+    """
+    Return the n-gram table for a language, or None if there is none.
+
+    Parameters:
+    -----------
+    language : str
+        Language key, e.g. 'en'
+
+    Returns:
+    --------
+    NgramTable or None
+        The shared, memory-mapped table
+    """
+    try:
+        path = _table_path(language)
+        if path is None or not os.path.exists(path):
+            return None
+        if not (_is_trusted(os.path.dirname(os.path.abspath(path))) and _is_trusted(path)):
+            return None
+        return NgramTable(path)
+    except (OSError, ValueError):
+        return None
+
+
+def match_confidence(text, match, table):
+    """
+    Estimate how likely a match is to be a real error.
+
+    Parameters:
+    -----------
+    text : str
+        The analysed text
+    match : dict
+        A match object from check_grammar
+    table : NgramTable
+        Frequencies from correct text
+
+    Returns:
+    --------
+    float
+        1.0 when the flagged words never occur in correct text, falling
+        towards 0 the more often they do
+    """
+    if match['rule']['category']['name'] in _SKIPPED_CATEGORIES:
+        return 1.0
+
+    # Whole words overlapping the flagged span, plus the next word when the
+    # span covers only one (e.g. "an h" -> "an hour")
+    start, end = match['offset'], match['offset'] + match['errorLength']
+    tokens = []
+    for word in _WORD.finditer(text, max(0, start - 64)):
+        if word.end() <= start:
+            continue
+        if word.start() >= end and len(tokens) >= MIN_ORDER:
+            break
+        tokens.append(word.group().lower())
+        if len(tokens) > MAX_ORDER:
+            # Long spans (e.g. sentence-wide rules) are outside the table
+            return 1.0
+    if len(tokens) < MIN_ORDER:
+        return 1.0
+
+    count = table.count(tokens)
+    return SMOOTHING / (SMOOTHING + count)
+
+
+def attach_confidence(text, matches, language):
+    """
+    Add a 'confidence' value between 0 and 1 to each match in place.
+
+    Parameters:
+    -----------
+    text : str
+        The analysed text
+    matches : list
+        Match objects from check_grammar
+    language : str
+        Language key selecting the n-gram table
+    """
+    table = get_table(language)
+    for match in matches:
+        confidence = match_confidence(text, match, table) if table is not None else 1.0
+        match['confidence'] = round(confidence, 3)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python ngram_confidence.py CORPUS.txt OUTPUT.ngrams")
+    with open(sys.argv[1], encoding="utf-8") as corpus:
+        build_table(corpus, sys.argv[2])
+    print(f"Wrote {len(NgramTable(sys.argv[2]))} n-grams to {sys.argv[2]}")
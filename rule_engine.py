@@ -0,0 +1,329 @@
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+from rule_packs import load_rules
+
+# How many compiled language engines a worker keeps in memory at once
+ENGINE_CACHE_SIZE = int(os.environ.get("GRAMMAR_ENGINE_CACHE_SIZE", "3"))
+
+# CPU-time budgets (seconds) for guarded checking of a single document.
+# Measured per thread, so contention with other sessions does not count.
+DOCUMENT_TIME_BUDGET = float(os.environ.get("GRAMMAR_DOCUMENT_TIME_BUDGET", "2.0"))
+RULE_TIME_BUDGET = float(os.environ.get("GRAMMAR_RULE_TIME_BUDGET", "0.25"))
+
+# A rule that overruns its budget on this many documents in a row is
+# suspended for every session until the cooldown has passed
+OVERRUNS_BEFORE_SUSPEND = 3
+RULE_COOLDOWN_SECONDS = float(os.environ.get("GRAMMAR_RULE_COOLDOWN_SECONDS", "300"))
+
+# Longest slice of text a rule with a repeat is run against at once
+MAX_CHUNK_CHARS = 1000
+
+# Repeats bounded by at most this are "narrow"; wider and unbounded repeats
+# are "wide", and a pattern may contain only one of those
+MAX_NARROW_REPEAT = 10
+
+# Cap on the product of (upper bound + 1) over the narrow repeats in a
+# pattern, which bounds the backtracking they can add together
+MAX_NARROW_PRODUCT = 16
+
+_REPEATS = {"MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT"}
+_SINGLE_CHARACTER = {"LITERAL", "NOT_LITERAL", "ANY", "IN", "CATEGORY"}
+
+def _single_character(items):
+    """True if the items match exactly one character (possibly inside groups)."""
+    while len(items) == 1 and str(items[0][0]) == "SUBPATTERN":
+        items = items[0][1][-1]
+    return len(items) == 1 and str(items[0][0]) in _SINGLE_CHARACTER
+
+def _scan(items, issues, wide, narrow):
+    for op, av in items:
+        name = str(op)
+        if name in _SINGLE_CHARACTER or name == "AT":
+            continue
+        if name in _REPEATS:
+            low, high, sub = av
+            if not _single_character(sub):
+                if high > 1:
+                    # Covers alternation and nested repeats under a quantifier
+                    issues.add("quantified group")
+                else:
+                    # An optional group is not repeated, so it is safe
+                    _scan(sub, issues, wide, narrow)
+            elif high == sre_parse.MAXREPEAT or high > MAX_NARROW_REPEAT:
+                wide.append(name)
+            elif high > low:
+                narrow.append(high)
+        elif name == "SUBPATTERN":
+            _scan(av[-1], issues, wide, narrow)
+        elif name == "BRANCH":
+            for alternative in av[1]:
+                _scan(alternative, issues, wide, narrow)
+        elif name in ("ASSERT", "ASSERT_NOT"):
+            _scan(av[1], issues, wide, narrow)
+        elif name in ("GROUPREF", "GROUPREF_EXISTS"):
+            issues.add("backreference")
+        else:
+            issues.add(f"unsupported syntax ({name.lower()})")
+
+def validate_pattern(pattern):
+    """
+    Check a rule pattern against an allow-list of regex syntax with a known
+    worst-case cost.
+    
+    Allowed: literals, character classes, anchors, groups, alternation and
+    lookarounds, and quantifiers applied to a single character. A quantified
+    group (which covers alternation or nested repeats under a quantifier,
+    e.g. '(a|aa)+') and backreferences are rejected, as is anything else
+    the checker does not recognise. So are patterns with more than one wide
+    repeat (upper bound above MAX_NARROW_REPEAT, or unbounded) and patterns
+    whose narrow repeats could together backtrack more than
+    MAX_NARROW_PRODUCT ways. What is left costs at most quadratic time in
+    the input length times a small constant, and any rule with a variable
+    repeat is only ever run on chunks of MAX_CHUNK_CHARS.
+    
+    Parameters:
+    -----------
+    pattern : str
+        The regular expression to check
+        
+    Returns:
+    --------
+    set
+        Issues found. 'repeat' alone means the rule is allowed but must be
+        chunked; any other issue means the rule is rejected.
+    """
+    issues = set()
+    wide = []
+    narrow = []
+    _scan(sre_parse.parse(pattern), issues, wide, narrow)
+    if len(wide) > 1:
+        issues.add("multiple wide repeats")
+    product = 1
+    for high in narrow:
+        product *= high + 1
+    if product > MAX_NARROW_PRODUCT:
+        issues.add("too many stacked repeats")
+    if wide or narrow:
+        issues.add("repeat")
+    return issues
+
+def _chunks(text, start=0, end=None):
+    """Yield (start, end) slices of at most MAX_CHUNK_CHARS, split at sentence ends."""
+    end = len(text) if end is None else end
+    for sentence in re.finditer(r"[^.!?]+[.!?]*|[.!?]+", text[start:end]):
+        chunk_start, sentence_end = start + sentence.start(), start + sentence.end()
+        while chunk_start < sentence_end:
+            chunk_end = min(chunk_start + MAX_CHUNK_CHARS, sentence_end)
+            if chunk_end < sentence_end:
+                # Avoid cutting a word in half where possible
+                space = text.rfind(" ", chunk_start, chunk_end)
+                if space > chunk_start:
+                    chunk_end = space
+            yield chunk_start, chunk_end
+            chunk_start = chunk_end
+
+class RuleEngine:
+    """
+    The compiled rule pack for one language.
+    
+    Parameters:
+    -----------
+    language : str
+        Language key, e.g. 'en'
+    rules : list
+        Rule dictionaries with 'pattern', 'message', 'category' and
+        optionally 'priority' and 'group'
+    """
+    
+    def __init__(self, language, rules):
+        self.language = language
+        self.rules = []
+        self.chunked = set()
+        # Rules rejected by validate_pattern: pattern -> report dict
+        self.rejected = {}
+        # Rules suspended after repeated overruns: pattern -> (report, resume time)
+        self._suspended = {}
+        # Consecutive documents on which each rule overran its budget
+        self._overruns = {}
+        self._lock = threading.Lock()
+        for rule in rules:
+            issues = validate_pattern(rule["pattern"])
+            if issues - {"repeat"}:
+                self.rejected[rule["pattern"]] = self._report(
+                    rule, "unsafe pattern: " + ", ".join(sorted(issues)))
+                continue
+            if issues:
+                self.chunked.add(rule["pattern"])
+            self.rules.append((re.compile(rule["pattern"], re.IGNORECASE), rule))
+    
+    @staticmethod
+    def _report(rule, reason):
+        return {
+            'pattern': rule["pattern"],
+            'message': rule["message"],
+            'reason': reason
+        }
+    
+    def _is_suspended(self, pattern):
+        entry = self._suspended.get(pattern)
+        if entry is None:
+            return False
+        if time.monotonic() < entry[1]:
+            return True
+        # Cooldown over: give the rule another chance
+        with self._lock:
+            self._suspended.pop(pattern, None)
+        return False
+    
+    def _record_overrun(self, rule, rule_budget):
+        pattern = rule["pattern"]
+        with self._lock:
+            count = self._overruns.get(pattern, 0) + 1
+            if count < OVERRUNS_BEFORE_SUSPEND:
+                self._overruns[pattern] = count
+                return
+            self._overruns.pop(pattern, None)
+            reason = (f"exceeded the {rule_budget:g}s CPU budget on {count} documents in a row; "
+                      f"suspended for {RULE_COOLDOWN_SECONDS:g}s")
+            self._suspended[pattern] = (self._report(rule, reason),
+                                        time.monotonic() + RULE_COOLDOWN_SECONDS)
+    
+    def _record_success(self, rule):
+        if rule["pattern"] in self._overruns:
+            with self._lock:
+                self._overruns.pop(rule["pattern"], None)
+    
+    def disabled_rules(self):
+        """
+        List the rules that are currently not being run.
+        
+        Returns:
+        --------
+        list
+            Report dicts ('pattern', 'message', 'reason') for rejected rules
+            and for rules suspended after repeated overruns
+        """
+        suspended = [report for pattern, (report, _) in list(self._suspended.items())
+                     if self._is_suspended(pattern)]
+        return list(self.rejected.values()) + suspended
+    
+    def finditer(self, text):
+        """
+        Run every rule over the text.
+        
+        Parameters:
+        -----------
+        text : str
+            The text to search
+            
+        Yields:
+        -------
+        tuple
+            (rule, re.Match) for each hit, grouped by rule in pack order
+        """
+        for pattern, rule in self.rules:
+            if self._is_suspended(rule["pattern"]):
+                continue
+            for match in pattern.finditer(text):
+                yield rule, match
+    
+    def run_guarded(self, text, document_budget=DOCUMENT_TIME_BUDGET,
+                    rule_budget=RULE_TIME_BUDGET):
+        """
+        Run every rule over the text within a CPU-time budget.
+        
+        validate_pattern bounds the cost of a single regex call: rules with
+        a variable repeat run one sentence (at most MAX_CHUNK_CHARS) at a
+        time, and rules without one take linear time. On top of
+        that the calling thread's CPU time is checked between matches and
+        between chunks. A rule that uses more than `rule_budget` is stopped
+        for this document, and once `document_budget` is spent the remaining
+        rules are skipped; either way the result is marked partial and hits
+        found so far are kept. A rule that overruns on
+        OVERRUNS_BEFORE_SUSPEND documents in a row is suspended for
+        RULE_COOLDOWN_SECONDS.
+        
+        Parameters:
+        -----------
+        text : str
+            The text to search
+        document_budget : float
+            CPU seconds allowed for the whole document
+        rule_budget : float
+            CPU seconds allowed for a single rule on this document
+            
+        Returns:
+        --------
+        tuple
+            (hits, report) where hits is a list of (rule, re.Match) and report
+            is a dict with 'partial', 'disabled_rules' and 'skipped_rules'
+        """
+        clock = time.thread_time
+        hits = []
+        skipped = []
+        deadline = clock() + document_budget
+        
+        for pattern, rule in self.rules:
+            if self._is_suspended(rule["pattern"]):
+                continue
+            rule_start = clock()
+            if rule_start >= deadline:
+                skipped.append(rule["pattern"])
+                continue
+            rule_deadline = min(deadline, rule_start + rule_budget)
+            
+            if rule["pattern"] in self.chunked:
+                spans = _chunks(text)
+            else:
+                spans = [(0, len(text))]
+            
+            stopped = False
+            for chunk_start, chunk_end in spans:
+                for match in pattern.finditer(text, chunk_start, chunk_end):
+                    hits.append((rule, match))
+                    if clock() > rule_deadline:
+                        stopped = True
+                        break
+                if stopped or clock() > rule_deadline:
+                    stopped = True
+                    break
+            
+            if stopped:
+                skipped.append(rule["pattern"])
+                if clock() - rule_start > rule_budget:
+                    self._record_overrun(rule, rule_budget)
+            else:
+                self._record_success(rule)
+        
+        report = {
+            'partial': bool(skipped),
+            'disabled_rules': self.disabled_rules(),
+            'skipped_rules': skipped
+        }
+        return hits, report
+
+@lru_cache(maxsize=ENGINE_CACHE_SIZE)
+def get_engine(language):
+    """
+    Return the engine for a language, loading and compiling its pack on first use.
+    
+    Parameters:
+    -----------
+    language : str
+        Language key, e.g. 'en'
+        
+    Returns:
+    --------
+    RuleEngine
+        The compiled engine, shared by all callers in this process
+    """
+    return RuleEngine(language, load_rules(language))
@@ -0,0 +1,46 @@
+import importlib
+
+DEFAULT_LANGUAGE = "en"
+
+# Supported languages: display name and the code passed to the speech recognizer.
+# Each language has a module in this package defining a RULES list in the same
+# format as the English pack. Packs are only imported when first requested.
+LANGUAGES = {
+    "en": {"name": "English", "speech_code": "en-US"},
+    "es": {"name": "Spanish", "speech_code": "es-ES"},
+    "de": {"name": "German", "speech_code": "de-DE"},
+}
+
+def speech_code(language):
+    """
+    Return the speech recognition language code for a language.
+    
+    Parameters:
+    -----------
+    language : str
+        Language key, e.g. 'en'
+        
+    Returns:
+    --------
+    str
+        Recognizer language code, e.g. 'en-US'
+    """
+    return LANGUAGES.get(language, LANGUAGES[DEFAULT_LANGUAGE])["speech_code"]
+
+def load_rules(language):
+    """
+    Import the rule pack for a language.
+    
+    Parameters:
+    -----------
+    language : str
+        Language key, e.g. 'en'
+        
+    Returns:
+    --------
+    list
+        The rule dictionaries for that language
+    """
+    if language not in LANGUAGES:
+        raise ValueError(f"Unsupported language: {language}")
+    return importlib.import_module(f"{__name__}.{language}").RULES
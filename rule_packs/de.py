@@ -0,0 +1,52 @@
+# German rule pack (see the English pack for the rule format)
+
+# Subject pronoun at the start of a sentence. Mid-sentence a pronoun is
+# often followed by a verb belonging to another subject (e.g. "du und ich
+# sind", "was glaubst du sind die Gründe").
+_START = r"(?:^|(?<=[.!?] ))"
+
+RULES = [
+    # Subject-verb agreement errors
+    {"pattern": _START + r"ich (bist|ist|sind|seid)\b", 
+     "message": "Subject-verb agreement error. Use 'bin' with 'ich'.", 
+     "category": "Agreement"},
+    {"pattern": _START + r"du (bin|ist|sind|seid)\b", 
+     "message": "Subject-verb agreement error. Use 'bist' with 'du'.", 
+     "category": "Agreement"},
+    # Not 'es': "es sind viele da" and "es bin ich" are correct
+    {"pattern": _START + r"er (bin|bist|sind|seid)\b", 
+     "message": "Subject-verb agreement error. Use 'ist' with 'er'.", 
+     "category": "Agreement"},
+    {"pattern": _START + r"wir (bin|bist|ist|seid)\b", 
+     "message": "Subject-verb agreement error. Use 'sind' with 'wir'.", 
+     "category": "Agreement"},
+    {"pattern": r"\bich (habe|hat|habt) (gegangen|gekommen|gefahren|geblieben)\b", 
+     "message": "Incorrect auxiliary. Verbs of motion and 'bleiben' form the perfect with 'sein'.", 
+     "category": "Grammar"},
+    
+    # Comparisons
+    {"pattern": r"\b(größer|kleiner|besser|schlechter|schneller|langsamer|älter|jünger) wie\b", 
+     "message": "Incorrect comparison. Use 'als' after a comparative.", 
+     "category": "Grammar"},
+    {"pattern": r"\bals wie\b", 
+     "message": "Incorrect comparison. Use either 'als' or 'wie', not both.", 
+     "category": "Grammar"},
+    
+    # Common confusions
+    {"pattern": r"\bdas selbe\b", 
+     "message": "Incorrect spelling. 'Dasselbe' is written as one word.", 
+     "category": "Spelling"},
+    {"pattern": r"\bwieviel\b", 
+     "message": "Incorrect spelling. Use 'wie viel'.", 
+     "category": "Spelling"},
+    
+    # Case after prepositions
+    {"pattern": r"\bwegen (dem|den)\b", 
+     "message": "'Wegen' takes the genitive in standard German (e.g. 'wegen des').", 
+     "category": "Style"},
+    
+    # Common redundancies
+    {"pattern": r"\bnochmal wiederholen\b", 
+     "message": "Redundant phrase. 'Wiederholen' already means doing it again.", 
+     "category": "Style"}
+]
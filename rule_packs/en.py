@@ -0,0 +1,122 @@
+# English rule pack
+# Rules may set "priority" (default 0) and "group". Hits reporting the same
+# mistake (same rule id and span, or overlapping hits from rules in the
+# same group) are collapsed into the highest-priority one.
+RULES = [
+    # Subject-verb agreement errors
+    {"pattern": r"\b(he|she|it) (are|were|have)\b", 
+     "message": "Subject-verb agreement error. Use 'is/was/has' with he/she/it.", 
+     "category": "Agreement"},
+    {"pattern": r"\b(they|we|you) (is|was|has)\b", 
+     "message": "Subject-verb agreement error. Use 'are/were/have' with they/we/you.", 
+     "category": "Agreement"},
+    {"pattern": r"\b(this|that) (are|were)\b", 
+     "message": "Subject-verb agreement error. Use 'is/was' with this/that.", 
+     "category": "Agreement"},
+    {"pattern": r"\b(these|those) (is|was)\b", 
+     "message": "Subject-verb agreement error. Use 'are/were' with these/those.", 
+     "category": "Agreement"},
+    
+    # Incorrect verb forms
+    {"pattern": r"\bhave went\b", 
+     "message": "Incorrect verb form. Use 'have gone' instead of 'have went'.", 
+     "category": "Grammar"},
+    {"pattern": r"\bhave came\b", 
+     "message": "Incorrect verb form. Use 'have come' instead of 'have came'.", 
+     "category": "Grammar"},
+    {"pattern": r"\bhave saw\b", 
+     "message": "Incorrect verb form. Use 'have seen' instead of 'have saw'.", 
+     "category": "Grammar"},
+    
+    # Double negatives
+    {"pattern": r"\b(don't|doesn't|didn't|can't|won't|haven't|hasn't|hadn't).*\b(no|nobody|nothing|nowhere|never)\b", 
+     "message": "Double negative detected. Use only one negative word.", 
+     "category": "Grammar"},
+    
+    # Common confusions
+    {"pattern": r"\byour (going|trying|looking|planning|coming|working)\b", 
+     "message": "Incorrect use of 'your'. Did you mean 'you're'?", 
+     "category": "Spelling"},
+    {"pattern": r"\btheir (going|trying|looking|planning|coming|working)\b", 
+     "message": "Incorrect use of 'their'. Did you mean 'they're'?", 
+     "category": "Spelling"},
+    {"pattern": r"\bits (going|trying|looking|planning|coming|working)\b", 
+     "message": "Incorrect use of 'its'. Did you mean 'it's'?", 
+     "category": "Spelling"},
+    {"pattern": r"\bthere (cat|dog|book|car|house|man|woman|friend|mother|father)\b", 
+     "message": "Incorrect use of 'there'. Did you mean 'their'?", 
+     "category": "Spelling"},
+    
+    # Incorrect article usage
+    {"pattern": r"\ban [^aeiou]", 
+     "message": "Incorrect article. Use 'a' before consonant sounds, not 'an'.", 
+     "category": "Grammar"},
+    {"pattern": r"\ba [aeiou]", 
+     "message": "Incorrect article. Use 'an' before vowel sounds, not 'a'.", 
+     "category": "Grammar"},
+    
+    # Common preposition errors
+    {"pattern": r"\bdifferent (to|than)\b", 
+     "message": "Incorrect preposition. Use 'different from'.", 
+     "category": "Grammar"},
+    {"pattern": r"\bin regards to\b", 
+     "message": "Incorrect phrase. Use 'with regard to' or 'regarding'.", 
+     "category": "Grammar"},
+    
+    # Common misused terms
+    {"pattern": r"\bshouldn't of\b", 
+     "message": "Incorrect phrase. Use 'shouldn't have' instead.", 
+     "category": "Grammar"},
+    {"pattern": r"\bcould of\b", 
+     "message": "Incorrect phrase. Use 'could have' instead.", 
+     "category": "Grammar"},
+    {"pattern": r"\bwould of\b", 
+     "message": "Incorrect phrase. Use 'would have' instead.", 
+     "category": "Grammar"},
+    {"pattern": r"\bmust of\b", 
+     "message": "Incorrect phrase. Use 'must have' instead.", 
+     "category": "Grammar"},
+    
+    # Common redundancies
+    {"pattern": r"\b(very) unique\b", 
+     "message": "Redundant phrase. 'Unique' doesn't need modifiers like 'very'.", 
+     "category": "Style"},
+    {"pattern": r"\batm machine\b", 
+     "message": "Redundant phrase. ATM already stands for Automated Teller Machine.", 
+     "category": "Style"},
+    
+    # Punctuation errors
+    {"pattern": r"[a-z][.?!] [a-z]", 
+     "message": "Capitalization error. Capitalize the first letter of a new sentence.", 
+     "category": "Punctuation",
+     "group": "SENTENCE_CAPITALIZATION"},
+    {"pattern": r"\b[A-Z][a-z]+ i\b", 
+     "message": "Capitalization error. The pronoun 'I' should always be capitalized.", 
+     "category": "Punctuation"},
+    
+    # Plural/singular confusion
+    {"pattern": r"\bthis (are|were)\b", 
+     "message": "Agreement error. Use 'is/was' with 'this'.", 
+     "category": "Agreement"},
+    {"pattern": r"\bthese (is|was)\b", 
+     "message": "Agreement error. Use 'are/were' with 'these'.", 
+     "category": "Agreement"},
+    
+    # More common ones
+    {"pattern": r"\bthey is\b", 
+     "message": "Subject-verb agreement error. Use 'they are' instead.", 
+     "category": "Agreement",
+     "priority": 1},
+    {"pattern": r"\bshe don't\b", 
+     "message": "Subject-verb agreement error. Use 'she doesn't' instead.", 
+     "category": "Agreement",
+     "priority": 1},
+    {"pattern": r"\bhe don't\b", 
+     "message": "Subject-verb agreement error. Use 'he doesn't' instead.", 
+     "category": "Agreement",
+     "priority": 1},
+    {"pattern": r"\bit don't\b", 
+     "message": "Subject-verb agreement error. Use 'it doesn't' instead.", 
+     "category": "Agreement",
+     "priority": 1}
+]
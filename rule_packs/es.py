@@ -0,0 +1,66 @@
+# Spanish rule pack (see the English pack for the rule format)
+
+# Subject pronoun at the start of a sentence. Elsewhere the pronoun often
+# belongs to a preposition or follows its verb (e.g. "para ellos es",
+# "los amigos de ella son", "lo que quiero yo es").
+_START = r"(?:^|(?<=[.!?] ))"
+
+RULES = [
+    # Subject-verb agreement errors
+    {"pattern": _START + r"yo (es|eres|somos|son)\b", 
+     "message": "Subject-verb agreement error. Use 'soy' with 'yo'.", 
+     "category": "Agreement"},
+    {"pattern": _START + r"(él|ella|usted) (soy|eres|somos|son)\b", 
+     "message": "Subject-verb agreement error. Use 'es' with él/ella/usted.", 
+     "category": "Agreement"},
+    {"pattern": _START + r"(ellos|ellas|ustedes) (soy|eres|es|somos)\b", 
+     "message": "Subject-verb agreement error. Use 'son' with ellos/ellas/ustedes.", 
+     "category": "Agreement"},
+    {"pattern": _START + r"nosotros (soy|eres|es|son)\b", 
+     "message": "Subject-verb agreement error. Use 'somos' with 'nosotros'.", 
+     "category": "Agreement"},
+    
+    # Incorrect verb forms
+    {"pattern": r"\bhaiga\b", 
+     "message": "Incorrect verb form. Use 'haya' instead of 'haiga'.", 
+     "category": "Grammar"},
+    {"pattern": r"\b(dijistes|hicistes|fuistes|vinistes|tuvistes|estuvistes)\b", 
+     "message": "Incorrect verb form. The preterite 'tú' form has no final 's' (e.g. 'dijiste').", 
+     "category": "Grammar"},
+    # Only before a noun: "cuando hubieron terminado" is correct
+    {"pattern": r"\bhubieron (muchos|muchas|varios|varias|personas|problemas)\b", 
+     "message": "Impersonal 'haber' is always singular. Use 'hubo'.", 
+     "category": "Grammar"},
+    {"pattern": r"\bhabían (muchos|muchas|varios|varias|personas|problemas)\b", 
+     "message": "Impersonal 'haber' is always singular. Use 'había'.", 
+     "category": "Grammar"},
+    
+    # Contractions and articles
+    {"pattern": r"\ba el\b(?! salvador\b)", 
+     "message": "Missing contraction. Use 'al' instead of 'a el'.", 
+     "category": "Grammar"},
+    {"pattern": r"\bde el\b(?! salvador\b)", 
+     "message": "Missing contraction. Use 'del' instead of 'de el'.", 
+     "category": "Grammar"},
+    {"pattern": r"\bla (agua|águila|alma|hambre|hacha|área)\b", 
+     "message": "Incorrect article. Use 'el' before feminine nouns starting with a stressed 'a'.", 
+     "category": "Grammar"},
+    
+    # Common confusions
+    # Only where a clause starts: "va a haber si llueve" is correct
+    {"pattern": r"(?:^|(?<=[.!?,] ))haber si\b", 
+     "message": "Incorrect use of 'haber'. Did you mean 'a ver si'?", 
+     "category": "Spelling"},
+    # "el sobretodo" (an overcoat) is correct
+    {"pattern": r"(?<!\bel )(?<!\bun )\bsobretodo\b", 
+     "message": "Incorrect spelling. Use 'sobre todo' (above all).", 
+     "category": "Spelling"},
+    
+    # Common redundancies
+    {"pattern": r"\bsubir (para|hacia) arriba\b", 
+     "message": "Redundant phrase. 'Subir' already means going up.", 
+     "category": "Style"},
+    {"pattern": r"\bbajar (para|hacia) abajo\b", 
+     "message": "Redundant phrase. 'Bajar' already means going down.", 
+     "category": "Style"}
+]
@@ -0,0 +1,327 @@
+import atexit
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+
+import streamlit as st
+
+# Budgets can be tuned per deployment through environment variables
+SESSION_BUDGET_BYTES = int(os.environ.get("GRAMMAR_SESSION_BUDGET_MB", "32")) * 1024 * 1024
+GLOBAL_BUDGET_BYTES = int(os.environ.get("GRAMMAR_GLOBAL_BUDGET_MB", "512")) * 1024 * 1024
+IDLE_TIMEOUT_SECONDS = int(os.environ.get("GRAMMAR_SESSION_IDLE_SECONDS", "1800"))
+
+# Objects smaller than this are never worth writing to disk
+SPILL_THRESHOLD_BYTES = 64 * 1024
+
+
+def estimate_size(value):
+    """
+    Estimate how many bytes an object stored for a session occupies.
+
+    Parameters:
+    -----------
+    value : object
+        The object to measure
+
+    Returns:
+    --------
+    int
+        Approximate size in bytes
+    """
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    frame_data = getattr(value, "frame_data", None)
+    if isinstance(frame_data, (bytes, bytearray)):
+        # AudioData: the raw samples dominate everything else
+        return len(frame_data)
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+class _Entry:
+    __slots__ = ("value", "size", "path")
+
+    def __init__(self, value, size):
+        self.value = value
+        self.size = size
+        self.path = None
+
+    @property
+    def spilled(self):
+        return self.path is not None
+
+
+class _Session:
+    __slots__ = ("entries", "last_access")
+
+    def __init__(self):
+        self.entries = {}
+        self.last_access = time.monotonic()
+
+    def resident_bytes(self):
+        return sum(e.size for e in self.entries.values() if not e.spilled)
+
+    def spilled_bytes(self):
+        return sum(e.size for e in self.entries.values() if e.spilled)
+
+
+class SessionResourceManager:
+    """
+    Hold large per-session objects under a per-session and a global byte budget.
+
+    Objects that push a session or the whole server over budget are pickled
+    to a temporary directory and loaded back on access. Sessions that have
+    not been touched for `idle_timeout` seconds are evicted entirely; the
+    check runs on every put, get and usage call, so any active session
+    (or the usage display) reclaims memory from abandoned ones.
+
+    Parameters:
+    -----------
+    session_budget : int
+        Maximum resident bytes for a single session
+    global_budget : int
+        Maximum resident bytes across all sessions
+    idle_timeout : float
+        Seconds of inactivity after which a session is evicted
+    spill_threshold : int
+        Minimum size of an object before it is considered for spilling
+    spill_dir : str or None
+        Directory for spilled objects (a fresh temp directory by default)
+    """
+
+    def __init__(self, session_budget=SESSION_BUDGET_BYTES, global_budget=GLOBAL_BUDGET_BYTES,
+                 idle_timeout=IDLE_TIMEOUT_SECONDS, spill_threshold=SPILL_THRESHOLD_BYTES,
+                 spill_dir=None):
+        self.session_budget = session_budget
+        self.global_budget = global_budget
+        self.idle_timeout = idle_timeout
+        self.spill_threshold = spill_threshold
+        self.spill_dir = spill_dir or tempfile.mkdtemp(prefix="grammar_spill_")
+        os.makedirs(self.spill_dir, exist_ok=True)
+        self._sessions = {}
+        self._lock = threading.RLock()
+        self._evicted_sessions = 0
+
+    def put(self, session_id, key, value):
+        """
+        Store an object for a session, spilling or evicting as needed.
+
+        Parameters:
+        -----------
+        session_id : str
+            Identifier of the owning session
+        key : str
+            Name of the object within the session
+        value : object
+            The object to store (must be picklable to be spillable)
+        """
+        with self._lock:
+            self.evict_idle()
+            session = self._touch(session_id)
+            self._drop_entry(session, key)
+            if value is None:
+                return
+            session.entries[key] = _Entry(value, estimate_size(value))
+            self._enforce_session_budget(session)
+            self._enforce_global_budget()
+
+    def get(self, session_id, key, default=None):
+        """
+        Fetch an object for a session, loading it from disk if it was spilled.
+
+        Parameters:
+        -----------
+        session_id : str
+            Identifier of the owning session
+        key : str
+            Name of the object within the session
+        default : object
+            Value returned when nothing is stored under `key`
+
+        Returns:
+        --------
+        object
+            The stored object, or `default`
+        """
+        with self._lock:
+            self.evict_idle()
+            session = self._touch(session_id)
+            entry = session.entries.get(key)
+            if entry is None:
+                return default
+            if not entry.spilled:
+                return entry.value
+            path = entry.path
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except OSError:
+            # Spill file vanished (temp dir cleaned up); treat as missing
+            return default
+
+    def discard(self, session_id, key):
+        """Remove a single object from a session."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._drop_entry(session, key)
+
+    def clear_session(self, session_id):
+        """Remove every object belonging to a session."""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                for key in list(session.entries):
+                    self._drop_entry(session, key)
+
+    def evict_idle(self, now=None):
+        """
+        Evict sessions that have been idle for longer than the timeout.
+
+        Parameters:
+        -----------
+        now : float or None
+            Current `time.monotonic()` value (mainly for testing)
+
+        Returns:
+        --------
+        int
+            Number of sessions evicted
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            idle = [sid for sid, s in self._sessions.items()
+                    if now - s.last_access > self.idle_timeout]
+            for sid in idle:
+                self.clear_session(sid)
+            self._evicted_sessions += len(idle)
+            return len(idle)
+
+    def usage(self):
+        """
+        Report current memory and disk usage.
+
+        Returns:
+        --------
+        dict
+            Resident and spilled bytes overall and per session, plus budgets
+        """
+        with self._lock:
+            # Reads must not report sessions that are already past their timeout
+            self.evict_idle()
+            sessions = {
+                sid: {
+                    "resident_bytes": s.resident_bytes(),
+                    "spilled_bytes": s.spilled_bytes(),
+                    "objects": len(s.entries),
+                    "idle_seconds": round(time.monotonic() - s.last_access, 1),
+                }
+                for sid, s in self._sessions.items()
+            }
+            return {
+                "resident_bytes": sum(s["resident_bytes"] for s in sessions.values()),
+                "spilled_bytes": sum(s["spilled_bytes"] for s in sessions.values()),
+                "active_sessions": len(sessions),
+                "evicted_sessions": self._evicted_sessions,
+                "session_budget_bytes": self.session_budget,
+                "global_budget_bytes": self.global_budget,
+                "sessions": sessions,
+            }
+
+    def _touch(self, session_id):
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = _Session()
+        session.last_access = time.monotonic()
+        return session
+
+    def _drop_entry(self, session, key):
+        entry = session.entries.pop(key, None)
+        if entry is not None and entry.spilled:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def _spill(self, entry):
+        path = os.path.join(self.spill_dir, f"{uuid.uuid4().hex}.pkl")
+        try:
+            with open(path, "wb") as f:
+                pickle.dump(entry.value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            # Unpicklable or disk full: keep it in memory
+            if os.path.exists(path):
+                os.remove(path)
+            return False
+        entry.path = path
+        entry.value = None
+        return True
+
+    def _spill_largest(self, session, excess):
+        """Spill a session's largest resident objects until `excess` bytes are freed."""
+        candidates = sorted(
+            (e for e in session.entries.values()
+             if not e.spilled and e.size >= self.spill_threshold),
+            key=lambda e: e.size, reverse=True)
+        freed = 0
+        for entry in candidates:
+            if freed >= excess:
+                break
+            if self._spill(entry):
+                freed += entry.size
+        return freed
+
+    def _enforce_session_budget(self, session):
+        excess = session.resident_bytes() - self.session_budget
+        if excess > 0:
+            self._spill_largest(session, excess)
+
+    def _enforce_global_budget(self):
+        excess = sum(s.resident_bytes() for s in self._sessions.values()) - self.global_budget
+        if excess <= 0:
+            return
+        # Least recently used sessions give up their memory first
+        for session in sorted(self._sessions.values(), key=lambda s: s.last_access):
+            excess -= self._spill_largest(session, excess)
+            if excess <= 0:
+                break
+
+
+@st.cache_resource
+def get_resource_manager():
+    """
+    Return the resource manager shared by every session in this server process.
+
+    Returns:
+    --------
+    SessionResourceManager
+        The process-wide manager
+    """
+    manager = SessionResourceManager()
+    # Spill files are only useful while this process is alive
+    atexit.register(shutil.rmtree, manager.spill_dir, True)
+    return manager
+
+
+def current_session_id():
+    """
+    Return a stable identifier for the current Streamlit session.
+
+    Returns:
+    --------
+    str
+        Identifier kept in `st.session_state` for the life of the session
+    """
+    if "resource_session_id" not in st.session_state:
+        st.session_state.resource_session_id = uuid.uuid4().hex
+    return st.session_state.resource_session_id
@@ -2,123 +2,12 @@ import re
 import streamlit as st
 import string
 from collections import Counter
+from match_resolver import resolve_matches
+from rule_engine import get_engine, DOCUMENT_TIME_BUDGET, RULE_TIME_BUDGET
+from rule_packs import DEFAULT_LANGUAGE
+from ngram_confidence import attach_confidence
 
-# Common grammar errors
-common_errors = [
-    # Subject-verb agreement errors
-    {"pattern": r"\b(he|she|it) (are|were|have)\b", 
-     "message": "Subject-verb agreement error. Use 'is/was/has' with he/she/it.", 
-     "category": "Agreement"},
-    {"pattern": r"\b(they|we|you) (is|was|has)\b", 
-     "message": "Subject-verb agreement error. Use 'are/were/have' with they/we/you.", 
-     "category": "Agreement"},
-    {"pattern": r"\b(this|that) (are|were)\b", 
-     "message": "Subject-verb agreement error. Use 'is/was' with this/that.", 
-     "category": "Agreement"},
-    {"pattern": r"\b(these|those) (is|was)\b", 
-     "message": "Subject-verb agreement error. Use 'are/were' with these/those.", 
-     "category": "Agreement"},
-    
-    # Incorrect verb forms
-    {"pattern": r"\bhave went\b", 
-     "message": "Incorrect verb form. Use 'have gone' instead of 'have went'.", 
-     "category": "Grammar"},
-    {"pattern": r"\bhave came\b", 
-     "message": "Incorrect verb form. Use 'have come' instead of 'have came'.", 
-     "category": "Grammar"},
-    {"pattern": r"\bhave saw\b", 
-     "message": "Incorrect verb form. Use 'have seen' instead of 'have saw'.", 
-     "category": "Grammar"},
-    
-    # Double negatives
-    {"pattern": r"\b(don't|doesn't|didn't|can't|won't|haven't|hasn't|hadn't).*\b(no|nobody|nothing|nowhere|never)\b", 
-     "message": "Double negative detected. Use only one negative word.", 
-     "category": "Grammar"},
-    
-    # Common confusions
-    {"pattern": r"\byour (going|trying|looking|planning|coming|working)\b", 
-     "message": "Incorrect use of 'your'. Did you mean 'you're'?", 
-     "category": "Spelling"},
-    {"pattern": r"\btheir (going|trying|looking|planning|coming|working)\b", 
-     "message": "Incorrect use of 'their'. Did you mean 'they're'?", 
-     "category": "Spelling"},
-    {"pattern": r"\bits (going|trying|looking|planning|coming|working)\b", 
-     "message": "Incorrect use of 'its'. Did you mean 'it's'?", 
-     "category": "Spelling"},
-    {"pattern": r"\bthere (cat|dog|book|car|house|man|woman|friend|mother|father)\b", 
-     "message": "Incorrect use of 'there'. Did you mean 'their'?", 
-     "category": "Spelling"},
-    
-    # Incorrect article usage
-    {"pattern": r"\ban [^aeiou]", 
-     "message": "Incorrect article. Use 'a' before consonant sounds, not 'an'.", 
-     "category": "Grammar"},
-    {"pattern": r"\ba [aeiou]", 
-     "message": "Incorrect article. Use 'an' before vowel sounds, not 'a'.", 
-     "category": "Grammar"},
-    
-    # Common preposition errors
-    {"pattern": r"\bdifferent (to|than)\b", 
-     "message": "Incorrect preposition. Use 'different from'.", 
-     "category": "Grammar"},
-    {"pattern": r"\bin regards to\b", 
-     "message": "Incorrect phrase. Use 'with regard to' or 'regarding'.", 
-     "category": "Grammar"},
-    
-    # Common misused terms
-    {"pattern": r"\bshouldn't of\b", 
-     "message": "Incorrect phrase. Use 'shouldn't have' instead.", 
-     "category": "Grammar"},
-    {"pattern": r"\bcould of\b", 
-     "message": "Incorrect phrase. Use 'could have' instead.", 
-     "category": "Grammar"},
-    {"pattern": r"\bwould of\b", 
-     "message": "Incorrect phrase. Use 'would have' instead.", 
-     "category": "Grammar"},
-    {"pattern": r"\bmust of\b", 
-     "message": "Incorrect phrase. Use 'must have' instead.", 
-     "category": "Grammar"},
-    
-    # Common redundancies
-    {"pattern": r"\b(very) unique\b", 
-     "message": "Redundant phrase. 'Unique' doesn't need modifiers like 'very'.", 
-     "category": "Style"},
-    {"pattern": r"\batm machine\b", 
-     "message": "Redundant phrase. ATM already stands for Automated Teller Machine.", 
-     "category": "Style"},
-    
-    # Punctuation errors
-    {"pattern": r"[a-z][.?!] [a-z]", 
-     "message": "Capitalization error. Capitalize the first letter of a new sentence.", 
-     "category": "Punctuation"},
-    {"pattern": r"\b[A-Z][a-z]+ i\b", 
-     "message": "Capitalization error. The pronoun 'I' should always be capitalized.", 
-     "category": "Punctuation"},
-    
-    # Plural/singular confusion
-    {"pattern": r"\bthis (are|were)\b", 
-     "message": "Agreement error. Use 'is/was' with 'this'.", 
-     "category": "Agreement"},
-    {"pattern": r"\bthese (is|was)\b", 
-     "message": "Agreement error. Use 'are/were' with 'these'.", 
-     "category": "Agreement"},
-    
-    # More common ones
-    {"pattern": r"\bthey is\b", 
-     "message": "Subject-verb agreement error. Use 'they are' instead.", 
-     "category": "Agreement"},
-    {"pattern": r"\bshe don't\b", 
-     "message": "Subject-verb agreement error. Use 'she doesn't' instead.", 
-     "category": "Agreement"},
-    {"pattern": r"\bhe don't\b", 
-     "message": "Subject-verb agreement error. Use 'he doesn't' instead.", 
-     "category": "Agreement"},
-    {"pattern": r"\bit don't\b", 
-     "message": "Subject-verb agreement error. Use 'it doesn't' instead.", 
-     "category": "Agreement"}
-]
-
-def check_grammar(text):
+def check_grammar(text, language=DEFAULT_LANGUAGE, document_budget=None, rule_budget=None):
     """
     Check text for common grammar errors using regex patterns
     
@@ -126,11 +15,20 @@ def check_grammar(text):
     -----------
     text : str
         The text to check for grammar errors
+    language : str
+        Language key selecting the rule pack, e.g. 'en'
+    document_budget : float or None
+        Seconds allowed for the whole document. Setting either budget runs
+        the rules in guarded mode (see RuleEngine.run_guarded).
+    rule_budget : float or None
+        Seconds allowed for a single rule
         
     Returns:
     --------
     dict
-        Dictionary containing grammar analysis results
+        Dictionary containing grammar analysis results. 'partial' is True
+        when the time budget stopped some rules; 'disabled_rules' lists rules
+        switched off for being unsafe or too slow.
     """
     if not text:
         return {'matches': [], 'total_errors': 0}
@@ -140,31 +38,47 @@ def check_grammar(text):
     # Convert text to lowercase for case-insensitive matching
     lower_text = text.lower()
     
-    # Check for each pattern
-    for error in common_errors:
-        for match in re.finditer(error["pattern"], lower_text, re.IGNORECASE):
-            start, end = match.span()
-            error_text = text[start:end]
-            
-            # Get some context around the error
-            context_start = max(0, start - 20)
-            context_end = min(len(text), end + 20)
-            context = text[context_start:context_end]
-            
-            # Create a match object similar to what LanguageTool would return
-            match_obj = {
-                'message': error["message"],
-                'offset': start,
-                'errorLength': end - start,
-                'context': context,
-                'replacements': [],  # Could add suggestions here
-                'rule': {
-                    'category': {'name': error["category"]},
-                    'id': f"CUSTOM_{error['category'].upper()}"
-                }
+    # Check for each pattern in the language's rule pack
+    engine = get_engine(language)
+    if document_budget is None and rule_budget is None:
+        hits = engine.finditer(lower_text)
+        report = {
+            'partial': False,
+            'disabled_rules': engine.disabled_rules(),
+            'skipped_rules': []
+        }
+    else:
+        hits, report = engine.run_guarded(
+            lower_text,
+            document_budget=DOCUMENT_TIME_BUDGET if document_budget is None else document_budget,
+            rule_budget=RULE_TIME_BUDGET if rule_budget is None else rule_budget
+        )
+    
+    for error, match in hits:
+        start, end = match.span()
+        error_text = text[start:end]
+        
+        # Get some context around the error
+        context_start = max(0, start - 20)
+        context_end = min(len(text), end + 20)
+        context = text[context_start:context_end]
+        
+        # Create a match object similar to what LanguageTool would return
+        match_obj = {
+            'message': error["message"],
+            'offset': start,
+            'errorLength': end - start,
+            'context': context,
+            'replacements': [],  # Could add suggestions here
+            'rule': {
+                'category': {'name': error["category"]},
+                'id': f"CUSTOM_{error['category'].upper()}",
+                'priority': error.get("priority", 0),
+                'group': error.get("group")
             }
-            
-            matches.append(match_obj)
+        }
+        
+        matches.append(match_obj)
     
     # Check for basic punctuation errors (ending sentences)
     sentences = re.split(r'(?<=[.!?]) +', text)
@@ -180,7 +94,11 @@ def check_grammar(text):
                     'replacements': [sentence[0].upper() + sentence[1:]],
                     'rule': {
                         'category': {'name': 'Punctuation'},
-                        'id': 'CUSTOM_CAPITALIZATION'
+                        'id': 'CUSTOM_CAPITALIZATION',
+                        # Same mistake as the pack's capitalization regex;
+                        # preferred over it because it suggests a fix
+                        'priority': 1,
+                        'group': 'SENTENCE_CAPITALIZATION'
                     }
                 }
                 matches.append(match_obj)
@@ -200,10 +118,19 @@ def check_grammar(text):
         }
         matches.append(match_obj)
     
+    # Collapse duplicate and overlapping hits so each mistake counts once
+    matches = resolve_matches(matches)
+    
+    # Down-weight hits on phrases that are common in correct text
+    attach_confidence(text, matches, language)
+    
     # Return analysis in a format similar to what we'd get from LanguageTool
     return {
         'matches': matches,
-        'total_errors': len(matches)
+        'total_errors': len(matches),
+        'partial': report['partial'],
+        'disabled_rules': report['disabled_rules'],
+        'skipped_rules': report['skipped_rules']
     }
 
 def calculate_grammar_score(text, matches):
@@ -215,7 +142,8 @@ def calculate_grammar_score(text, matches):
     text : str
         The original text that was analyzed
     matches : list
-        List of grammar issues found
+        List of grammar issues found. Each match counts with its
+        'confidence' (default 1), so likely false positives weigh less.
         
     Returns:
     --------
@@ -231,8 +159,9 @@ def calculate_grammar_score(text, matches):
     # Calculate words in text
     word_count = len(text.split())
     
-    # Calculate error rate (errors per 100 words)
-    error_rate = (len(matches) / word_count) * 100
+    # Calculate error rate (confidence-weighted errors per 100 words)
+    weighted_errors = sum(match.get('confidence', 1.0) for match in matches)
+    error_rate = (weighted_errors / word_count) * 100
     
     # Calculate score (100 - error rate, with minimum 0)
     # Cap error rate at 50 to ensure very bad text still gets some score
@@ -0,0 +1,66 @@
+import random
+
+import speech_recognition as sr
+
+# Sample speech used when no microphone is available
+SAMPLE_TEXTS = (
+    "Hello world this is a grammar test",
+    "I have been working on my english skills for many years",
+    "This sentence contains two grammatical error",
+    "She don't like ice cream but I do",
+    "The weather are nice today and we should go outside",
+    "I would of gone to the party if I had been invited",
+    "Between you and I this project is very exciting",
+    "Their going to announce the winners tomorrow morning",
+    "I have went to the store already",
+    "The book was laying on the table all day"
+)
+
+# Format of the silent placeholder clip: 44.1 kHz, 16-bit mono, no samples
+SAMPLE_RATE = 44100
+SAMPLE_WIDTH = 2
+
+class SimulatedInputBackend:
+    """
+    Serve simulated recordings from a table built once in memory.
+
+    Each entry is an `sr.AudioData` for an empty clip with the sample text
+    attached as `sample_text`, which transcribe_from_microphone returns
+    directly. Entries are never modified after construction, so the same
+    objects can be handed to every caller and thread without copying.
+
+    Parameters:
+    -----------
+    texts : sequence of str
+        The sample transcripts to serve
+    """
+
+    def __init__(self, texts=SAMPLE_TEXTS):
+        self._table = []
+        for text in texts:
+            audio_data = sr.AudioData(b"", SAMPLE_RATE, SAMPLE_WIDTH)
+            audio_data.sample_text = text
+            self._table.append(audio_data)
+        self._table = tuple(self._table)
+
+    def __len__(self):
+        return len(self._table)
+
+    def sample(self, rng=random):
+        """
+        Return a random simulated recording.
+
+        Parameters:
+        -----------
+        rng : random.Random or module
+            Source of randomness (the `random` module by default)
+
+        Returns:
+        --------
+        AudioData
+            A shared, read-only audio data object with `sample_text` set
+        """
+        return rng.choice(self._table)
+
+# Shared by every session; building it costs a few microseconds at import
+default_backend = SimulatedInputBackend()
@@ -4,7 +4,7 @@ from grammar_analyzer import get_grammar_score
 import re
 from collections import Counter
 
-def highlight_errors(text, matches):
+def highlight_errors(text, matches, start=0, end=None):
     """
     Create an HTML-highlighted version of the text with grammar errors marked.
     
@@ -14,36 +14,140 @@ def highlight_errors(text, matches):
         The original text
     matches : list
         List of grammar issues found by LanguageTool
+    start : int
+        Offset of the first character to render
+    end : int or None
+        Offset one past the last character to render (defaults to the end)
         
     Returns:
     --------
     str
-        HTML-formatted string with errors highlighted
+        HTML-formatted string for text[start:end] with errors highlighted
     """
+    end = len(text) if end is None else end
     if not matches:
-        return text
+        return text[start:end]
     
-    # Sort matches by position (from end to beginning to avoid offset issues)
-    sorted_matches = sorted(matches, key=lambda x: x['offset'], reverse=True)
-    
-    # Insert HTML tags for highlighting
-    highlighted_text = text
-    for match in sorted_matches:
+    # Build the output in one pass from left to right instead of re-slicing
+    # the whole string for every match
+    pieces = []
+    position = start
+    for match in sorted(matches, key=lambda x: x['offset']):
         offset = match['offset']
         length = match['errorLength']
-        error_text = highlighted_text[offset:offset + length]
+        # Skip matches outside the window or overlapping one already drawn
+        if offset < position or offset + length > end:
+            continue
+        error_text = text[offset:offset + length]
         
         # Create tooltip with error message
         tooltip_text = match['message']
         
-        # Replace the error with highlighted version
-        highlighted_text = (
-            highlighted_text[:offset] + 
-            f'<span style="background-color: #ffdddd; border-bottom: 2px solid red;" title="{tooltip_text}">{error_text}</span>' + 
-            highlighted_text[offset + length:]
+        pieces.append(text[position:offset])
+        pieces.append(
+            f'<span style="background-color: #ffdddd; border-bottom: 2px solid red;" title="{tooltip_text}">{error_text}</span>'
         )
+        position = offset + length
+    pieces.append(text[position:end])
+    
+    return ''.join(pieces)
+
+def highlight_excerpts(text, matches, padding=80):
+    """
+    Highlight only the parts of the text surrounding the given matches.
+    
+    Matches whose surrounding windows touch are merged into one excerpt, and
+    excerpts are joined with ellipses. The output size depends on the number
+    of matches passed in, not on the length of the text.
+    
+    Parameters:
+    -----------
+    text : str
+        The original text
+    matches : list
+        The grammar issues to show (typically one page of results)
+    padding : int
+        Characters of context to show on either side of each match
+        
+    Returns:
+    --------
+    str
+        HTML-formatted excerpts with errors highlighted
+    """
+    if not matches:
+        return ''
+    
+    # Group matches into clusters whose context windows overlap
+    clusters = []
+    for match in sorted(matches, key=lambda x: x['offset']):
+        window_start = max(0, match['offset'] - padding)
+        window_end = min(len(text), match['offset'] + match['errorLength'] + padding)
+        if clusters and window_start <= clusters[-1][1]:
+            clusters[-1][1] = max(clusters[-1][1], window_end)
+            clusters[-1][2].append(match)
+        else:
+            clusters.append([window_start, window_end, [match]])
+    
+    excerpts = []
+    for window_start, window_end, cluster in clusters:
+        excerpt = highlight_errors(text, cluster, window_start, window_end)
+        prefix = '…' if window_start > 0 else ''
+        suffix = '…' if window_end < len(text) else ''
+        excerpts.append(prefix + excerpt + suffix)
+    
+    return ' '.join(excerpts)
+
+def summarize_matches(matches):
+    """
+    Group grammar issues by category and rule for a compact summary table.
+    
+    Parameters:
+    -----------
+    matches : list
+        List of grammar issues
+        
+    Returns:
+    --------
+    DataFrame
+        One row per (category, rule, message) with its number of occurrences,
+        most frequent first
+    """
+    columns = ['Category', 'Rule', 'Issue', 'Count']
+    if not matches:
+        return pd.DataFrame(columns=columns)
     
-    return highlighted_text
+    counts = Counter(
+        (match.get('rule', {}).get('category', {}).get('name', 'Other'),
+         match.get('rule', {}).get('id', ''),
+         match['message'])
+        for match in matches
+    )
+    rows = [(category, rule_id, message, count)
+            for (category, rule_id, message), count in counts.most_common()]
+    return pd.DataFrame(rows, columns=columns)
+
+def paginate(items, page, page_size):
+    """
+    Return one page of a list.
+    
+    Parameters:
+    -----------
+    items : list
+        The full list
+    page : int
+        1-based page number (clamped to the valid range)
+    page_size : int
+        Number of items per page
+        
+    Returns:
+    --------
+    tuple
+        (items on the page, index of the first item, total number of pages)
+    """
+    total_pages = max(1, -(-len(items) // page_size))
+    page = min(max(1, page), total_pages)
+    first = (page - 1) * page_size
+    return items[first:first + page_size], first, total_pages
 
 def categorize_error(match):
     """
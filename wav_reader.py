@@ -0,0 +1,259 @@
+import mmap
+import os
+import struct
+
+import numpy as np
+import speech_recognition as sr
+
+# Length of each chunk handed to the recognizer when streaming a WAV file
+SEGMENT_SECONDS = 30
+
+# WAVE format tags we can read without decoding
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# NumPy dtypes for the PCM sample widths we support (8-bit WAV is unsigned)
+_SAMPLE_DTYPES = {1: np.uint8, 2: np.int16, 4: np.int32}
+
+
+def is_wav(path):
+    """
+    Check whether a file starts with a RIFF/WAVE header.
+
+    Parameters:
+    -----------
+    path : str
+        Path to the file to inspect
+
+    Returns:
+    --------
+    bool
+        True if the file looks like a WAV file
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(12)
+    except OSError:
+        return False
+    return len(header) == 12 and header[:4] == b'RIFF' and header[8:12] == b'WAVE'
+
+
+class WavReader:
+    """
+    Read a PCM WAV file through a read-only memory map.
+
+    The sample data is never copied into Python memory as a whole. Frames are
+    exposed as `memoryview` slices or NumPy views over the mapping, so the
+    operating system only pages in the parts that are actually touched.
+    Views returned by this class must not outlive the reader.
+
+    Parameters:
+    -----------
+    path : str
+        Path to a PCM WAV file (8, 16 or 32-bit integer samples)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            if size == 0:
+                raise ValueError("WAV file is empty")
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        try:
+            self._parse_header()
+        except struct.error as e:
+            # A chunk claims more bytes than the file holds
+            self.close()
+            raise ValueError(f"Truncated WAV header: {e}") from e
+        except Exception:
+            self.close()
+            raise
+
+        # Hint to the kernel that we read front to back
+        if hasattr(self._mm, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+            self._mm.madvise(mmap.MADV_SEQUENTIAL)
+
+    def _parse_header(self):
+        mm = self._mm
+        if len(mm) < 12 or mm[:4] != b'RIFF' or mm[8:12] != b'WAVE':
+            raise ValueError("Not a RIFF/WAVE file")
+
+        fmt = None
+        data_offset = None
+        data_length = None
+
+        # Walk the RIFF chunks without reading the payloads
+        pos = 12
+        while pos + 8 <= len(mm):
+            chunk_id = mm[pos:pos + 4]
+            chunk_size = struct.unpack_from('<I', mm, pos + 4)[0]
+            body = pos + 8
+            if chunk_id == b'fmt ':
+                fmt = struct.unpack_from('<HHIIHH', mm, body)
+                if fmt[0] == _WAVE_FORMAT_EXTENSIBLE and chunk_size >= 40:
+                    # The real format tag is the first two bytes of the sub-format GUID
+                    subformat = struct.unpack_from('<H', mm, body + 24)[0]
+                    fmt = (subformat,) + fmt[1:]
+            elif chunk_id == b'data':
+                data_offset = body
+                # Some writers leave the size at 0 or 0xFFFFFFFF when streaming
+                data_length = min(chunk_size, len(mm) - body)
+                if chunk_size in (0, 0xFFFFFFFF):
+                    data_length = len(mm) - body
+                break
+            # Chunks are padded to an even number of bytes
+            pos = body + chunk_size + (chunk_size & 1)
+
+        if fmt is None or data_offset is None:
+            raise ValueError("WAV file is missing a 'fmt ' or 'data' chunk")
+
+        format_tag, channels, sample_rate, _, block_align, bits_per_sample = fmt
+        sample_width = bits_per_sample // 8
+        if format_tag != _WAVE_FORMAT_PCM or sample_width not in _SAMPLE_DTYPES:
+            raise ValueError(
+                f"Unsupported WAV encoding (format {format_tag}, {bits_per_sample}-bit)")
+        if channels < 1 or block_align != channels * sample_width:
+            raise ValueError("Inconsistent WAV header")
+
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self._block_align = block_align
+        self._data_offset = data_offset
+        self.n_frames = data_length // block_align
+
+    @property
+    def duration(self):
+        """Length of the audio in seconds."""
+        return self.n_frames / self.sample_rate if self.sample_rate else 0.0
+
+    def _byte_range(self, start, stop):
+        stop = self.n_frames if stop is None else min(stop, self.n_frames)
+        start = max(0, min(start, stop))
+        begin = self._data_offset + start * self._block_align
+        return begin, self._data_offset + stop * self._block_align
+
+    def frames(self, start=0, stop=None):
+        """
+        Return raw interleaved frames as a zero-copy `memoryview`.
+
+        Parameters:
+        -----------
+        start : int
+            Index of the first frame
+        stop : int or None
+            Index one past the last frame (defaults to the end of the file)
+
+        Returns:
+        --------
+        memoryview
+            View over the mapped sample bytes
+        """
+        begin, end = self._byte_range(start, stop)
+        return memoryview(self._mm)[begin:end]
+
+    def as_array(self, start=0, stop=None):
+        """
+        Return frames as a zero-copy NumPy array of shape (frames, channels).
+
+        Parameters:
+        -----------
+        start : int
+            Index of the first frame
+        stop : int or None
+            Index one past the last frame (defaults to the end of the file)
+
+        Returns:
+        --------
+        numpy.ndarray
+            Read-only view over the mapped sample data
+        """
+        begin, end = self._byte_range(start, stop)
+        dtype = _SAMPLE_DTYPES[self.sample_width]
+        count = (end - begin) // self.sample_width
+        samples = np.frombuffer(self._mm, dtype=dtype, count=count, offset=begin)
+        return samples.reshape(-1, self.channels)
+
+    def iter_segments(self, seconds=SEGMENT_SECONDS):
+        """
+        Yield consecutive (start, stop) frame ranges covering the file.
+
+        Parameters:
+        -----------
+        seconds : float
+            Length of each segment in seconds
+
+        Yields:
+        -------
+        tuple
+            (start_frame, stop_frame) for each segment
+        """
+        step = max(1, int(seconds * self.sample_rate))
+        for start in range(0, self.n_frames, step):
+            yield start, min(start + step, self.n_frames)
+
+    def to_audio_data(self, start=0, stop=None):
+        """
+        Build a mono `sr.AudioData` for a range of frames.
+
+        Only the requested segment is materialised. Multi-channel audio is
+        mixed down to mono by averaging the channels (`sr.AudioFile` sums
+        them instead, which can clip loud audio).
+
+        Parameters:
+        -----------
+        start : int
+            Index of the first frame
+        stop : int or None
+            Index one past the last frame (defaults to the end of the file)
+
+        Returns:
+        --------
+        AudioData
+            Audio data for the segment, ready for recognition
+        """
+        if self.channels == 1:
+            frame_data = self.frames(start, stop).tobytes()
+        else:
+            samples = self.as_array(start, stop)
+            dtype = samples.dtype
+            mixed = samples.mean(axis=1, dtype=np.float64)
+            frame_data = np.round(mixed).astype(dtype).tobytes()
+        return sr.AudioData(frame_data, self.sample_rate, self.sample_width)
+
+    def release(self, start=0, stop=None):
+        """
+        Drop the pages backing a range of frames from this process.
+
+        The data stays in the file and is paged back in if accessed again,
+        so calling this after a segment has been processed keeps resident
+        memory bounded by the segment size rather than the file size.
+        """
+        if not hasattr(self._mm, 'madvise') or not hasattr(mmap, 'MADV_DONTNEED'):
+            return
+        begin, end = self._byte_range(start, stop)
+        begin -= begin % mmap.PAGESIZE
+        if end > begin:
+            self._mm.madvise(mmap.MADV_DONTNEED, begin, end - begin)
+
+    def close(self):
+        """Unmap the file and close the underlying handle."""
+        try:
+            self._mm.close()
+        except BufferError:
+            # A caller still holds a view; the mapping is freed with it
+            pass
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()